@@ -14,3 +14,7 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
 
 application = get_asgi_application()
+
+from config.template_warmup import warm_up_on_boot  # noqa: E402
+
+warm_up_on_boot()
@@ -0,0 +1,35 @@
+from django import template
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.templatetags.static import static
+from django.utils.html import format_html, format_html_join
+
+from .static_pipeline import get_bundles
+
+register = template.Library()
+
+TAGS = {
+    '.css': '<link rel="stylesheet" href="{}">',
+    '.js': '<script src="{}" defer></script>',
+}
+
+# هل الملف المجمع موجود في STATIC_ROOT؟ يُفحص مرة واحدة لكل عملية
+_collected = {}
+
+
+def is_collected(name):
+    if name not in _collected:
+        _collected[name] = staticfiles_storage.exists(name)
+    return _collected[name]
+
+
+@register.simple_tag
+def static_bundle(name):
+    """
+    ملف مجمع واحد مع بصمة في الإنتاج، والملفات الأصلية منفصلة في وضع التطوير
+    أو إذا لم يُشغل collectstatic بعد. الاستخدام: {% static_bundle 'css/site.css' %}
+    """
+    tag = TAGS[name[name.rfind('.'):]]
+    if settings.DEBUG or not is_collected(name):
+        return format_html_join('\n', tag, ((static(source),) for source in get_bundles()[name]))
+    return format_html(tag, static(name))
@@ -0,0 +1,140 @@
+"""Project-wide middleware."""
+import mimetypes
+import os
+import re
+import time
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, HttpResponseNotModified
+from django.utils._os import safe_join
+from django.utils.http import http_date
+
+REFRESHED_AT_KEY = '_refreshed_at'
+
+
+class SlidingSessionMiddleware:
+    """
+    Sliding session expiry without a write on every request.
+
+    Replaces ``SESSION_SAVE_EVERY_REQUEST``: an existing session is re-saved (and
+    its cookie/expiry pushed forward) only when the last refresh is older than
+    ``SESSION_REFRESH_THRESHOLD`` seconds.  Requests without a session cookie are
+    left alone, so anonymous catalog traffic never creates or touches a session.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        session = getattr(request, 'session', None)
+        if session is None or session.session_key is None and not session.modified:
+            return response
+        if session.is_empty():
+            return response
+        now = int(time.time())
+        threshold = getattr(settings, 'SESSION_REFRESH_THRESHOLD', 86400)
+        if session.modified or now - session.get(REFRESHED_AT_KEY, 0) >= threshold:
+            # تعديل الجلسة يجعل SessionMiddleware يحفظها ويجدد الكوكي
+            session[REFRESHED_AT_KEY] = now
+        return response
+
+
+class StaticFilesMiddleware:
+    """
+    Serve collected static files from the app itself.
+
+    Files are read from ``STATIC_ROOT`` as produced by ``collectstatic``; the
+    ``.br``/``.gz`` variant written by ``CompressedManifestStaticFilesStorage``
+    is sent when the client accepts it.  Fingerprinted names never change, so
+    they are cached for a year as ``immutable``; other files get a short
+    max-age and are revalidated through ``ETag``.
+    """
+
+    ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+    HASHED_NAME = re.compile(r'\.[0-9a-f]{12}\.')
+    IMMUTABLE_MAX_AGE = 31536000
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.prefix = settings.STATIC_URL if settings.STATIC_URL.startswith('/') else '/' + settings.STATIC_URL
+        self.root = str(settings.STATIC_ROOT) if settings.STATIC_ROOT else None
+        self.max_age = getattr(settings, 'STATIC_MAX_AGE', 60)
+        # بعد النشر لا تتغير الملفات، فتُحفظ نتيجة stat لكل ملف طوال عمر العملية
+        self.files = {}
+
+    def __call__(self, request):
+        if self.root and request.method in ('GET', 'HEAD') and request.path_info.startswith(self.prefix):
+            response = self.serve(request, request.path_info[len(self.prefix):])
+            if response is not None:
+                return response
+        return self.get_response(request)
+
+    def find(self, name):
+        found = self.files.get(name)
+        if found is not None and not settings.DEBUG:
+            return found
+        try:
+            path = safe_join(self.root, name)
+            stat = os.stat(path)
+        except (SuspiciousFileOperation, OSError, ValueError):
+            return None
+        if not os.path.isfile(path):
+            return None
+        found = (path, stat.st_size, f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"', stat.st_mtime)
+        # الملفات الموجودة فقط، فلا يكبر القاموس مع طلبات لمسارات عشوائية
+        self.files[name] = found
+        return found
+
+    @staticmethod
+    def accepted_encodings(header):
+        """الترميزات المقبولة من Accept-Encoding، مع استبعاد ما قيمته q=0"""
+        accepted = set()
+        for part in header.split(','):
+            token, *params = [piece.strip() for piece in part.split(';')]
+            quality = 1.0
+            for param in params:
+                key, _, value = param.partition('=')
+                if key.strip().lower() == 'q':
+                    try:
+                        quality = float(value)
+                    except ValueError:
+                        quality = 0.0
+            if token and quality > 0:
+                accepted.add(token.lower())
+        return accepted
+
+    def serve(self, request, name):
+        original = self.find(name)
+        if not name or original is None:
+            return None
+
+        found, encoding = original, None
+        accepted = self.accepted_encodings(request.headers.get('Accept-Encoding', ''))
+        for candidate, suffix in self.ENCODINGS:
+            if candidate in accepted:
+                variant = self.find(name + suffix)
+                if variant is not None:
+                    found, encoding = variant, candidate
+                    break
+
+        path, size, etag, mtime = found
+        if request.headers.get('If-None-Match') == etag:
+            response = HttpResponseNotModified()
+        else:
+            content_type, _ = mimetypes.guess_type(name)
+            response = FileResponse(open(path, 'rb'), content_type=content_type or 'application/octet-stream')
+            response['Content-Length'] = size
+            response['Last-Modified'] = http_date(mtime)
+            if encoding:
+                response['Content-Encoding'] = encoding
+        response['ETag'] = etag
+        # يكفي وجود نسخة مضغوطة لأي ترميز حتى تختلف الاستجابة حسب Accept-Encoding
+        if any(self.find(name + suffix) for _, suffix in self.ENCODINGS):
+            response['Vary'] = 'Accept-Encoding'
+        if self.HASHED_NAME.search(name):
+            response['Cache-Control'] = f'public, max-age={self.IMMUTABLE_MAX_AGE}, immutable'
+        else:
+            response['Cache-Control'] = f'public, max-age={self.max_age}'
+        return response
@@ -12,6 +12,8 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 
 from pathlib import Path
 
+from decouple import Csv, config
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -23,9 +25,9 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 SECRET_KEY = 'django-insecure-vi@g(rjfxuoucumh0_hy!s+sjl5^^kpvqsenjh%x+2x0_7uq1k'
 
 # SECURITY WARNING: don't run with debug turned on in production!
-DEBUG = True
+DEBUG = config('DEBUG', default=True, cast=bool)
 
-ALLOWED_HOSTS = []
+ALLOWED_HOSTS = config('ALLOWED_HOSTS', default='', cast=Csv())
 
 
 # Application definition
@@ -51,7 +53,9 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'config.middleware.StaticFilesMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
+    'config.middleware.SlidingSessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
@@ -66,8 +70,14 @@ TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         'DIRS': [BASE_DIR / 'templates'],
-        'APP_DIRS': True,
         'OPTIONS': {
+            # القوالب تُقرأ وتُترجم مرة واحدة لكل عملية؛ في وضع التطوير يُفرغ runserver الكاش عند تعديل أي قالب
+            'loaders': [
+                ('django.template.loaders.cached.Loader', [
+                    'django.template.loaders.filesystem.Loader',
+                    'django.template.loaders.app_directories.Loader',
+                ]),
+            ],
             'context_processors': [
                 'django.template.context_processors.debug',
                 'django.template.context_processors.request',
@@ -75,23 +85,97 @@ TEMPLATES = [
                 'django.contrib.messages.context_processors.messages',
                 'django.template.context_processors.media',
             ],
+            'libraries': {
+                'static_bundles': 'config.bundle_tags',
+            },
         },
     },
 ]
 
 WSGI_APPLICATION = 'config.wsgi.application'
 
+# ترجمة كل قوالب المشروع عند تشغيل كل عملية (wsgi/asgi) بدل أول طلب؛ يُسجل الزمن في config.template_warmup
+TEMPLATE_WARMUP = config('TEMPLATE_WARMUP', default=not DEBUG, cast=bool)
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'config': {'handlers': ['console'], 'level': 'INFO'},
+    },
+}
+
 
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
-DATABASES = {
+# يتم اختيار قاعدة البيانات من متغيرات البيئة: DB_ENGINE=sqlite (افتراضي) أو postgres
+DB_ENGINE = config('DB_ENGINE', default='sqlite')
+
+if DB_ENGINE == 'postgres':
+    # يتطلب تثبيت psycopg على الخادم
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': config('DB_NAME', default='entity_medical'),
+            'USER': config('DB_USER', default='postgres'),
+            'PASSWORD': config('DB_PASSWORD', default=''),
+            'HOST': config('DB_HOST', default='localhost'),
+            'PORT': config('DB_PORT', default='5432'),
+            # اتصالات دائمة بدل فتح اتصال جديد مع كل طلب، مع فحص الاتصال قبل إعادة استخدامه
+            'CONN_MAX_AGE': config('DB_CONN_MAX_AGE', default=600, cast=int),
+            'CONN_HEALTH_CHECKS': True,
+            # المؤشرات من جهة الخادم تجعل .iterator() يقرأ على دفعات؛ يجب تعطيلها خلف pgbouncer بوضع transaction
+            'DISABLE_SERVER_SIDE_CURSORS': config('DB_DISABLE_SERVER_SIDE_CURSORS', default=False, cast=bool),
+            'OPTIONS': {
+                'connect_timeout': config('DB_CONNECT_TIMEOUT', default=5, cast=int),
+            },
+        }
+    }
+else:
+    # WAL يسمح للقراءة بالاستمرار أثناء الكتابة (مثل إتمام الطلبات أثناء تصفح الكتالوج)، لكنه إعداد دائم
+    # يُكتب في ملف القاعدة نفسها؛ لذلك هو اختياري (SQLITE_WAL=True) ومعطل افتراضيًا حتى لا يتغير db.sqlite3 المرفق بالمستودع
+    SQLITE_WAL = config('SQLITE_WAL', default=False, cast=bool)
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': config('DB_NAME', default=str(BASE_DIR / 'db.sqlite3')),
+            'CONN_MAX_AGE': config('DB_CONN_MAX_AGE', default=60, cast=int),
+            'OPTIONS': {
+                # انتظار القفل بالثواني بدل الفشل فورًا بخطأ database is locked
+                'timeout': config('SQLITE_BUSY_TIMEOUT', default=20, cast=int),
+                # حجز قفل الكتابة من بداية المعاملة حتى لا تفشل ترقية القفل في منتصفها
+                'transaction_mode': 'IMMEDIATE',
+                'init_command': (
+                    # synchronous=NORMAL آمن مع WAL فقط
+                    ('PRAGMA journal_mode=WAL;PRAGMA synchronous=NORMAL;' if SQLITE_WAL else '')
+                    + f"PRAGMA mmap_size={config('SQLITE_MMAP_SIZE', default=134217728, cast=int)};"
+                    'PRAGMA temp_store=MEMORY;'
+                ),
+            },
+        }
+    }
+
+
+# Cache
+# locmem لكل عملية افتراضيًا؛ يمكن استبداله بـ FileBasedCache أو Redis لمشاركة الكاش بين العمليات
+
+CACHES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'entity-medical',
     }
 }
 
+# مدة صلاحية بيانات الكتالوج المخزنة (الفئات والمنتجات المميزة) بالثواني
+CATALOG_CACHE_TIMEOUT = 300
+
+# مدة تخزين صفحات الكتالوج المعروضة للزوار غير المسجلين بالثواني
+PAGE_CACHE_TIMEOUT = 600
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -121,9 +205,44 @@ STATIC_URL = '/static/'
 STATICFILES_DIRS = [BASE_DIR / 'static']
 STATIC_ROOT = BASE_DIR / 'staticfiles'
 
+# الملفات المجمعة: تُبنى عند collectstatic وتأخذ بصمة (site.<hash>.css) ونسخ .gz/.br مضغوطة مسبقًا،
+# ويخدمها StaticFilesMiddleware مع Cache-Control: immutable. في وضع التطوير تُحمّل الملفات الأصلية منفصلة.
+# الترتيب مهم: style.css أولًا لأنه يبدأ بـ @import، و responsive.css أخيرًا
+STATIC_BUNDLES = {
+    'css/site.css': [
+        'css/style.css',
+        'css/contact.css',
+        'css/offers.css',
+        'css/products.css',
+        'css/product-details.css',
+        'css/profile.css',
+        'css/about.css',
+        'css/index.css',
+        'css/responsive.css',
+    ],
+    'js/site.js': [
+        'js/app.js',
+        'js/cart.js',
+    ],
+}
+STATICFILES_FINDERS = [
+    'django.contrib.staticfiles.finders.FileSystemFinder',
+    'django.contrib.staticfiles.finders.AppDirectoriesFinder',
+    'config.static_pipeline.BundleFinder',
+]
+STORAGES = {
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    'staticfiles': {'BACKEND': 'config.static_pipeline.CompressedManifestStaticFilesStorage'},
+}
+# مدة التخزين المؤقت للملفات الثابتة بدون بصمة (بالثواني)
+STATIC_MAX_AGE = 60
+
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# عروض النسخ المصغرة (WebP/JPEG) المولدة لصور المنتجات وشعارات الشركات
+IMAGE_RENDITION_WIDTHS = (320, 640, 1024)
+
 CRISPY_ALLOWED_TEMPLATE_PACKS = "bootstrap5"
 CRISPY_TEMPLATE_PACK = "bootstrap5"
 
@@ -131,8 +250,33 @@ LOGIN_URL = 'users:login'
 LOGIN_REDIRECT_URL = 'home'
 LOGOUT_REDIRECT_URL = 'home'
 
-SESSION_COOKIE_AGE = 1209600  
-SESSION_SAVE_EVERY_REQUEST = True
+# cached_db يقرأ الجلسة من الكاش ويكتب في قاعدة البيانات عند التعديل فقط؛
+# يمكن اختيار django.contrib.sessions.backends.signed_cookies لجلسات بدون تخزين على الخادم
+SESSION_ENGINE = config('SESSION_ENGINE', default='django.contrib.sessions.backends.cached_db')
+SESSION_COOKIE_AGE = 1209600
+# بدل SESSION_SAVE_EVERY_REQUEST: تُجدد صلاحية الجلسة فقط إذا مر على آخر تجديد أكثر من هذه المدة (بالثواني)
+SESSION_REFRESH_THRESHOLD = 86400
+
+# عدد الثواني بين كل كتابة مجمعة لعدادات مشاهدة المنتجات
+PRODUCT_VIEWS_FLUSH_INTERVAL = 30
+
+# عدد المنتجات في صفحة الكتالوج والحد الأقصى المسموح به عبر ?page_size=
+PRODUCTS_PAGE_SIZE = 12
+PRODUCTS_MAX_PAGE_SIZE = 48
+
+# مولد أرقام الطلبات؛ كل عملية تحجز معرف عامل من قاعدة البيانات عند أول طلب.
+# ORDER_NUMBER_WORKER_ID (0-255) يثبت المعرف ويصلح فقط عند التشغيل بعملية واحدة
+ORDER_NUMBER_GENERATOR = 'orders.numbering.TimeOrderedOrderNumberGenerator'
+ORDER_NUMBER_WORKER_ID = None
+
+# سلال الزوار التي لم تُستخدم منذ هذا العدد من الأيام يحذفها أمر purge_carts
+CART_ABANDONED_DAYS = 30
+
+# مخزن السلة: DatabaseCartStore (افتراضي) أو CacheCartStore الذي يحفظ السلة في الكاش
+# ويكتبها في قاعدة البيانات كل CART_STORE_FLUSH_INTERVAL ثانية وعند إتمام الطلب؛
+# يحتاج CacheCartStore كاش مشترك بين العمليات (Redis/Memcached) وليس locmem
+CART_STORE = config('CART_STORE', default='orders.cart_store.DatabaseCartStore')
+CART_STORE_FLUSH_INTERVAL = 30
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
@@ -0,0 +1,174 @@
+"""
+Static asset pipeline.
+
+* ``STATIC_BUNDLES`` maps a bundle name (``css/site.css``) to the static files
+  concatenated into it, in order.  ``BundleFinder`` exposes the bundles to
+  ``collectstatic`` as regular files, so they are fingerprinted and their
+  ``url()`` references rewritten like any other CSS.  Sources stay in the
+  same directory as their bundle, so relative URLs keep working.
+* ``CompressedManifestStaticFilesStorage`` is Django's manifest storage
+  (``site.3f2a9c1b0d4e.css``).  After hashing it writes ``.gz`` (and ``.br``
+  when the optional ``brotli`` package is installed) next to each text asset.
+  ``url()`` references to missing files are left untouched instead of
+  aborting ``collectstatic``.
+* ``config.middleware.StaticFilesMiddleware`` serves ``STATIC_ROOT`` from the
+  app itself, picking the precompressed variant and sending immutable cache
+  headers for fingerprinted names.
+
+Build step: run ``python manage.py collectstatic --noinput`` on every deploy,
+before starting the workers.  Until it has run (no ``staticfiles.json`` in
+``STATIC_ROOT``), pages still render: every file is linked by its plain name
+and ``{% static_bundle %}`` links the bundle's sources.
+"""
+import gzip
+import os
+from datetime import datetime, timezone
+
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.contrib.staticfiles.finders import BaseFinder
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.files.base import ContentFile
+from django.core.files.storage import Storage
+
+try:
+    import brotli
+except ImportError:  # اختياري: بدون brotli يتم توليد gzip فقط
+    brotli = None
+
+COMPRESSIBLE_EXTENSIONS = ('.css', '.js', '.svg', '.json', '.txt', '.xml', '.html', '.map', '.webmanifest')
+
+# لا يُحفظ الملف المضغوط إلا إذا وفّر أكثر من 5% من الحجم
+MIN_COMPRESSION_RATIO = 0.95
+
+
+def get_bundles():
+    return getattr(settings, 'STATIC_BUNDLES', {})
+
+
+def bundle_separator(name):
+    # ملفات JS المتتالية قد لا تنتهي بفاصلة منقوطة
+    return b';\n' if name.endswith('.js') else b'\n'
+
+
+class BundleStorage(Storage):
+    """Read-only storage whose files are built by concatenating their sources."""
+
+    def __init__(self, bundles=None):
+        self.bundles = bundles if bundles is not None else get_bundles()
+
+    def source_paths(self, name):
+        paths = []
+        for source in self.bundles[name]:
+            path = finders.find(source)
+            if not path:
+                raise FileNotFoundError(f'Static bundle {name!r}: source {source!r} not found')
+            paths.append(path)
+        return paths
+
+    def build(self, name):
+        parts = []
+        for path in self.source_paths(name):
+            with open(path, 'rb') as source:
+                parts.append(source.read().rstrip())
+        return bundle_separator(name).join(parts) + b'\n'
+
+    def _open(self, name, mode='rb'):
+        return ContentFile(self.build(name), name=name)
+
+    def exists(self, name):
+        return name in self.bundles
+
+    def path(self, name):
+        return f'<bundle {name}>'
+
+    def size(self, name):
+        return len(self.build(name))
+
+    def get_modified_time(self, name):
+        latest = max(os.path.getmtime(path) for path in self.source_paths(name))
+        return datetime.fromtimestamp(latest, tz=timezone.utc)
+
+    def listdir(self, path):
+        return [], []
+
+
+class BundleFinder(BaseFinder):
+    """Lists the STATIC_BUNDLES for collectstatic; in development the template tag links the sources instead."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.storage = BundleStorage()
+
+    def find(self, path, find_all=False, **kwargs):
+        return []
+
+    def list(self, ignore_patterns):
+        for name in self.storage.bundles:
+            yield name, self.storage
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    # ملف غير موجود في الـ manifest يُخدم باسمه الأصلي بدل رفع خطأ
+    manifest_strict = False
+
+    def load_manifest(self):
+        # الأسماء المحسوبة لكل عملية، حتى لا يُقرأ ملف غير موجود في الـ manifest مع كل طلب
+        self.stored_names = {}
+        return super().load_manifest()
+
+    def save_manifest(self):
+        self.stored_names = {}
+        super().save_manifest()
+
+    def stored_name(self, name):
+        if not self.hashed_files:
+            # لم يُشغل collectstatic بعد: لا توجد ملفات ببصمة في STATIC_ROOT، فتُخدم بأسمائها
+            return name
+        stored = self.stored_names.get(name)
+        if stored is None:
+            try:
+                stored = super().stored_name(name)
+            except ValueError:
+                # الملف غير موجود في STATIC_ROOT: الاسم بدون بصمة
+                stored = name
+            self.stored_names[name] = stored
+        return stored
+
+    def url_converter(self, name, hashed_files, template=None):
+        converter = super().url_converter(name, hashed_files, template)
+
+        def safe_converter(matchobj):
+            try:
+                return converter(matchobj)
+            except ValueError:
+                # مرجع لملف غير موجود في static (مثل صور خلفية محذوفة): يبقى كما هو
+                return matchobj.group(0)
+
+        return safe_converter
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run=dry_run, **options)
+        if dry_run:
+            return
+        for name in paths:
+            self.compress(name)
+            hashed_name = self.hashed_files.get(self.hash_key(self.clean_name(name)))
+            if hashed_name and hashed_name != name:
+                self.compress(hashed_name)
+
+    def compress(self, name):
+        if not name.endswith(COMPRESSIBLE_EXTENSIONS) or not self.exists(name):
+            return
+        with self.open(name) as source:
+            data = source.read()
+        variants = [('.gz', lambda raw: gzip.compress(raw, compresslevel=9, mtime=0))]
+        if brotli is not None:
+            variants.append(('.br', lambda raw: brotli.compress(raw, quality=11)))
+        for suffix, compress in variants:
+            compressed = compress(data)
+            if len(compressed) >= len(data) * MIN_COMPRESSION_RATIO:
+                continue
+            if self.exists(name + suffix):
+                self.delete(name + suffix)
+            self._save(name + suffix, ContentFile(compressed))
@@ -0,0 +1,75 @@
+"""
+Compile every project template into the cached template loader at worker boot.
+
+``wsgi.py``/``asgi.py`` call ``warm_up_on_boot()`` once the application is
+loaded, so the first request in each worker doesn't pay the compile cost of
+``base.html`` and the large page templates.  With ``gunicorn --preload`` the
+compiled templates are built once in the master and shared by the forked
+workers.  Only templates under ``BASE_DIR`` are compiled (not the admin or
+third-party packages); the timings are logged to ``config.template_warmup``.
+"""
+import logging
+import os
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.template import TemplateDoesNotExist, TemplateSyntaxError, engines
+from django.template.utils import get_app_template_dirs
+
+logger = logging.getLogger(__name__)
+
+TEMPLATE_EXTENSIONS = ('.html', '.txt', '.xml')
+
+
+def project_template_dirs(engine):
+    base_dir = Path(settings.BASE_DIR).resolve()
+    dirs = [Path(d) for d in engine.dirs] + [Path(d) for d in get_app_template_dirs('templates')]
+    return [d for d in dirs if d.is_dir() and d.resolve().is_relative_to(base_dir)]
+
+
+def project_templates(engine):
+    names = []
+    for directory in project_template_dirs(engine):
+        for root, _, files in os.walk(directory):
+            for filename in files:
+                if filename.endswith(TEMPLATE_EXTENSIONS):
+                    name = Path(root, filename).relative_to(directory).as_posix()
+                    if name not in names:
+                        names.append(name)
+    return sorted(names)
+
+
+def warm_templates(using='django'):
+    """
+    Load every project template through the engine's loaders (filling the
+    cached loader) and return ``(timings, errors)``: ``[(name, ms), ...]``
+    slowest first, and ``[(name, error), ...]`` for templates that failed.
+    """
+    engine = engines[using].engine
+    timings, errors = [], []
+    for name in project_templates(engine):
+        start = time.perf_counter()
+        try:
+            engine.get_template(name)
+        except (TemplateSyntaxError, TemplateDoesNotExist) as exc:
+            errors.append((name, exc))
+            continue
+        timings.append((name, (time.perf_counter() - start) * 1000))
+    timings.sort(key=lambda item: item[1], reverse=True)
+    return timings, errors
+
+
+def warm_up_on_boot():
+    if not getattr(settings, 'TEMPLATE_WARMUP', False):
+        return
+    start = time.perf_counter()
+    timings, errors = warm_templates()
+    total = (time.perf_counter() - start) * 1000
+    logger.info(
+        'Compiled %d templates in %.1f ms (pid %d); slowest: %s',
+        len(timings), total, os.getpid(),
+        ', '.join(f'{name} {ms:.1f} ms' for name, ms in timings[:5]),
+    )
+    for name, exc in errors:
+        logger.warning('Template %s failed to compile: %s', name, exc)
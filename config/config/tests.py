@@ -0,0 +1,164 @@
+import gzip
+import shutil
+import tempfile
+import time
+from pathlib import Path
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.sessions.models import Session
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.management import call_command
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+
+from . import bundle_tags
+from .middleware import REFRESHED_AT_KEY, StaticFilesMiddleware
+from .static_pipeline import CompressedManifestStaticFilesStorage
+
+MANIFEST_STORAGES = {
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    'staticfiles': {'BACKEND': 'config.static_pipeline.CompressedManifestStaticFilesStorage'},
+}
+
+
+class StaticRootTestMixin:
+    """STATIC_ROOT مؤقت لكل اختبار"""
+
+    def setUp(self):
+        super().setUp()
+        self.root = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.root, ignore_errors=True)
+        self.enterContext(override_settings(STATIC_ROOT=self.root))
+        bundle_tags._collected.clear()
+        self.addCleanup(bundle_tags._collected.clear)
+
+    def write(self, name, content):
+        path = self.root / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(content)
+        return path
+
+
+class ProductionRenderTests(TestCase):
+    def test_home_renders_without_collectstatic(self):
+        # manage.py test يعمل بـ DEBUG=False، والـ staticfiles المتتبع بدون manifest
+        response = self.client.get('/')
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, '"/static/css/style.css"')
+        self.assertNotRegex(response.content.decode(), r'/static/\S+\.[0-9a-f]{12}\.')
+
+
+@override_settings(SESSION_REFRESH_THRESHOLD=3600)
+class SlidingSessionMiddlewareTests(TestCase):
+    def test_anonymous_get_writes_no_session(self):
+        response = self.client.get('/')
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn(settings.SESSION_COOKIE_NAME, response.cookies)
+        self.assertFalse(Session.objects.exists())
+
+    def test_refresh_only_after_threshold(self):
+        session = self.client.session
+        session['cart_key'] = 'k'
+        session[REFRESHED_AT_KEY] = now = int(time.time())
+        session.save()
+
+        with mock.patch('config.middleware.time.time', return_value=now + 3599):
+            response = self.client.get('/')
+        self.assertNotIn(settings.SESSION_COOKIE_NAME, response.cookies)
+        self.assertEqual(self.client.session[REFRESHED_AT_KEY], now)
+
+        with mock.patch('config.middleware.time.time', return_value=now + 3600):
+            response = self.client.get('/')
+        self.assertIn(settings.SESSION_COOKIE_NAME, response.cookies)
+        self.assertEqual(self.client.session[REFRESHED_AT_KEY], now + 3600)
+
+
+class StaticBundleTagTests(StaticRootTestMixin, SimpleTestCase):
+    def test_sources_in_debug(self):
+        with self.settings(DEBUG=True):
+            html = bundle_tags.static_bundle('js/site.js')
+        self.assertIn('<script src="/static/js/app.js" defer></script>', html)
+        self.assertIn('<script src="/static/js/cart.js" defer></script>', html)
+
+    def test_sources_when_bundle_not_collected(self):
+        html = bundle_tags.static_bundle('css/site.css')
+        self.assertIn('href="/static/css/style.css"', html)
+        self.assertNotIn('site.css', html)
+
+    def test_bundle_when_collected(self):
+        self.write('css/site.css', b'body{}')
+        html = bundle_tags.static_bundle('css/site.css')
+        self.assertEqual(html, '<link rel="stylesheet" href="/static/css/site.css">')
+
+
+@override_settings(STORAGES=MANIFEST_STORAGES)
+class ManifestStorageTests(StaticRootTestMixin, SimpleTestCase):
+    def test_plain_names_without_manifest(self):
+        # الملفات موجودة في STATIC_ROOT (مثل staticfiles المتتبع) لكن بدون staticfiles.json
+        self.write('css/style.css', b'body{}')
+        storage = CompressedManifestStaticFilesStorage(location=self.root)
+        self.assertEqual(storage.url('css/style.css'), '/static/css/style.css')
+        self.assertEqual(storage.url('css/missing.css'), '/static/css/missing.css')
+
+    def test_unlisted_file_keeps_plain_name(self):
+        call_command('collectstatic', interactive=False, verbosity=0)
+        storage = CompressedManifestStaticFilesStorage(location=self.root)
+        self.assertRegex(storage.url('css/style.css'), r'^/static/css/style\.[0-9a-f]{12}\.css$')
+        self.assertEqual(storage.url('css/missing.css'), '/static/css/missing.css')
+
+    def test_collectstatic_builds_hashed_compressed_bundles(self):
+        call_command('collectstatic', interactive=False, verbosity=0)
+        html = bundle_tags.static_bundle('css/site.css')
+        self.assertRegex(html, r'href="/static/css/site\.[0-9a-f]{12}\.css"')
+        hashed = staticfiles_storage.stored_name('css/site.css')
+        self.assertEqual(
+            gzip.decompress((self.root / (hashed + '.gz')).read_bytes()),
+            (self.root / hashed).read_bytes(),
+        )
+
+
+class StaticFilesMiddlewareTests(StaticRootTestMixin, SimpleTestCase):
+    def setUp(self):
+        super().setUp()
+        self.write('js/app.js', b'console.log(1);' * 100)
+        self.write('js/app.js.gz', gzip.compress(b'console.log(1);' * 100))
+        self.write('js/app.0123456789ab.js', b'console.log(1);')
+        self.middleware = StaticFilesMiddleware(lambda request: HttpResponse('app'))
+        self.factory = RequestFactory()
+
+    def get(self, path, **headers):
+        return self.middleware(self.factory.get(path, headers=headers))
+
+    def test_serves_gzip_when_accepted(self):
+        response = self.get('/static/js/app.js', accept_encoding='br, gzip;q=0.8')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(response['Vary'], 'Accept-Encoding')
+
+    def test_refused_encoding_is_not_served(self):
+        response = self.get('/static/js/app.js', accept_encoding='gzip;q=0, identity')
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertEqual(b''.join(response.streaming_content), b'console.log(1);' * 100)
+
+    def test_accepted_encodings(self):
+        self.assertEqual(
+            StaticFilesMiddleware.accepted_encodings('GZIP ; q=0.5, br;q=0, deflate;q=bad, identity'),
+            {'gzip', 'identity'},
+        )
+
+    def test_hashed_names_are_immutable(self):
+        response = self.get('/static/js/app.0123456789ab.js')
+        self.assertIn('immutable', response['Cache-Control'])
+        self.assertEqual(self.get('/static/js/app.js')['Cache-Control'], 'public, max-age=60')
+
+    def test_not_modified(self):
+        etag = self.get('/static/js/app.js')['ETag']
+        self.assertEqual(self.get('/static/js/app.js', if_none_match=etag).status_code, 304)
+
+    def test_misses_fall_through_and_are_not_cached(self):
+        for index in range(3):
+            response = self.get(f'/static/js/missing-{index}.js')
+            self.assertEqual(response.content, b'app')
+        self.assertEqual(self.get('/static/../settings.py').content, b'app')
+        self.assertTrue(all(found is not None for found in self.middleware.files.values()))
+        self.assertNotIn('js/missing-0.js', self.middleware.files)
@@ -3,12 +3,14 @@ from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
 from products import views as product_views  
+from products import page_cache
 from django.views.generic import TemplateView, RedirectView
 from django.contrib.sitemaps.views import sitemap
 from django.contrib.sitemaps import Sitemap
 from products.models import Product
 from offers.models import Offer
 urlpatterns = [
+    path('admin/cache-stats/', page_cache.stats_view, name='page_cache_stats'),
     path('admin/', admin.site.urls),
 
     path('', product_views.home, name='home'),
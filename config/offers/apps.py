@@ -3,3 +3,6 @@ from django.apps import AppConfig
 
 class OffersConfig(AppConfig):
     name = 'offers'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,84 @@
+import re
+import time
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth.models import AnonymousUser
+from django.contrib.staticfiles import finders
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.template import engines
+from django.template.loader import get_template
+from django.test import RequestFactory
+from django.utils import timezone
+
+from offers.models import Offer, OfferProduct
+from products.models import Category, Product
+
+TEMPLATE_NAME = 'offers/offer_detail.html'
+STYLESHEET = re.compile(r'<link rel="stylesheet" href="\{% static \'([^\']+)\' %\}" />')
+SCRIPT = re.compile(r'<script src="\{% static \'([^\']+)\' %\}" defer></script>')
+
+
+def read_asset(name):
+    with open(finders.find(name), encoding='utf-8') as asset:
+        return asset.read()
+
+
+def inline_assets(source):
+    """يعيد بناء الصفحة القديمة: نفس القالب مع CSS/JS مضمنة بدل الروابط"""
+    source = STYLESHEET.sub(lambda m: f'<style>\n{read_asset(m.group(1))}</style>', source)
+    return SCRIPT.sub(lambda m: f'<script>\n{read_asset(m.group(1))}</script>', source)
+
+
+class Command(BaseCommand):
+    help = 'Compare offer detail response size and template compile/render time with inline vs static assets (data is rolled back)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--products', type=int, default=12)
+        parser.add_argument('--repeat', type=int, default=200)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            self.run(options['products'], options['repeat'])
+            transaction.set_rollback(True)
+
+    def run(self, product_count, repeat):
+        category = Category.objects.create(name='bench', slug='bench-offer-detail')
+        products = Product.objects.bulk_create([
+            Product(category=category, name=f'bench {i}', slug=f'bench-offer-detail-{i}', description='', price=Decimal('100.00') + i)
+            for i in range(product_count)
+        ])
+        now = timezone.now()
+        offer = Offer.objects.create(
+            title='bench', description='bench', discount_value=10,
+            start_date=now - timedelta(days=1), end_date=now + timedelta(days=1),
+        )
+        OfferProduct.objects.bulk_create([OfferProduct(offer=offer, product=product) for product in products])
+        # قائمة ثابتة حتى لا يدخل وقت الاستعلامات في قياس الرسم
+        offer_products = list(OfferProduct.objects.filter(offer=offer).select_related('product__primary_image', 'product__brand'))
+        context = {'offer': offer, 'offer_products': offer_products}
+
+        request = RequestFactory().get(f'/offers/{offer.id}/')
+        request.user = AnonymousUser()
+
+        source = get_template(TEMPLATE_NAME).template.source
+        assets = STYLESHEET.findall(source) + SCRIPT.findall(source)
+        asset_bytes = sum(len(read_asset(name).encode()) for name in assets)
+        variants = [('inline', inline_assets(source)), ('static', source)]
+
+        self.stdout.write(f'{"variant":<9}{"HTML bytes":>12}{"compile ms":>12}{"render ms":>11}')
+        for label, variant_source in variants:
+            compile_ms = self.measure(lambda: engines['django'].from_string(variant_source), repeat)
+            template = engines['django'].from_string(variant_source)
+            html = template.render(context, request).encode()
+            render_ms = self.measure(lambda: template.render(context, request), repeat)
+            self.stdout.write(f'{label:<9}{len(html):>12}{compile_ms:>12.3f}{render_ms:>11.3f}')
+        self.stdout.write(f'static assets: {len(assets)} files, {asset_bytes} bytes (downloaded once, then served from the browser cache)')
+
+    def measure(self, func, repeat):
+        func()
+        start = time.perf_counter()
+        for _ in range(repeat):
+            func()
+        return (time.perf_counter() - start) * 1000 / repeat
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('offers', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='offer',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['end_date', 'start_date'], name='offer_active_window_idx'),
+        ),
+    ]
@@ -28,6 +28,14 @@ class Offer(models.Model):
         verbose_name = 'عرض'
         verbose_name_plural = 'العروض'
         ordering = ['-created_at']
+        indexes = [
+            # العروض السارية: نطاق على end_date ثم start_date للعروض النشطة فقط
+            models.Index(
+                fields=['end_date', 'start_date'],
+                name='offer_active_window_idx',
+                condition=models.Q(is_active=True),
+            ),
+        ]
     
     def __str__(self):
         return self.title
@@ -0,0 +1,139 @@
+"""
+Offer pricing engine.
+
+Keeps an in-memory index of product -> offers that have not ended yet, each
+as a (start, end) interval.  The set of offers live *now* is precomputed and
+only recomputed when the clock passes the next interval boundary (an offer
+starting or ending), at which point the catalog version is bumped so cached
+pages and totals pick up the new prices.  The whole index is reloaded (one
+query) whenever the catalog version changes, i.e. after any Offer,
+OfferProduct or Product edit, and at least every ``CATALOG_CACHE_TIMEOUT``
+seconds: with the per-process locmem cache other workers never see the
+version bump, so the age limit bounds how long they price with stale offers.
+"""
+import bisect
+import threading
+from collections import defaultdict, namedtuple
+from datetime import timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.utils import timezone
+
+from products import catalog_cache
+from products.models import Product
+
+from .models import OfferProduct
+
+CENT = Decimal('0.01')
+
+Interval = namedtuple('Interval', 'start end offer_type discount_value')
+
+
+def apply_offer(price, interval):
+    if interval.offer_type == 'percentage':
+        price = price - price * interval.discount_value / 100
+    else:
+        price = price - interval.discount_value
+    return max(price, Decimal('0'))
+
+
+class OfferIndex:
+    def __init__(self, rows, version, now):
+        self.version = version
+        self.loaded_at = now
+        self.intervals = defaultdict(list)
+        boundaries = set()
+        for product_id, offer_type, discount_value, start, end in rows:
+            self.intervals[product_id].append(Interval(start, end, offer_type, discount_value))
+            boundaries.add(start)
+            # العرض صالح حتى end شاملًا، فيتغير السعر بعدها مباشرة
+            boundaries.add(end + timedelta(microseconds=1))
+        self.boundaries = sorted(boundaries)
+        self.activate(now)
+
+    def activate(self, now):
+        # يُبنى القاموس كاملًا ثم يُستبدل مرة واحدة، فلا ترى الخيوط الأخرى فهرسًا نصف ممتلئ
+        active = {}
+        for product_id, intervals in self.intervals.items():
+            live = [interval for interval in intervals if interval.start <= now <= interval.end]
+            if live:
+                active[product_id] = live
+        self.active = active
+        position = bisect.bisect_right(self.boundaries, now)
+        self.next_boundary = self.boundaries[position] if position < len(self.boundaries) else None
+
+    def is_expired(self, now):
+        max_age = getattr(settings, 'CATALOG_CACHE_TIMEOUT', 300)
+        return now - self.loaded_at >= timedelta(seconds=max_age)
+
+    def is_due(self, now):
+        return self.next_boundary is not None and now >= self.next_boundary
+
+    def offers_for(self, product_id):
+        return self.active.get(product_id, [])
+
+    def price(self, product_id, base_price):
+        """أفضل سعر للعميل: سعر المنتج بعد خصمه ثم أكبر خصم من العروض السارية"""
+        base_price = Decimal(base_price)
+        prices = [apply_offer(base_price, interval) for interval in self.offers_for(product_id)]
+        return min([base_price, *prices]).quantize(CENT)
+
+
+_lock = threading.Lock()
+_index = None
+
+
+def load_index(version, now):
+    rows = OfferProduct.objects.filter(
+        offer__is_active=True,
+        offer__end_date__gte=now,
+    ).values_list(
+        'product_id', 'offer__offer_type', 'offer__discount_value',
+        'offer__start_date', 'offer__end_date',
+    )
+    return OfferIndex(rows, version, now)
+
+
+def get_index(now=None):
+    """The current offer index, reloaded or re-activated as needed."""
+    global _index
+    now = now or timezone.now()
+    version = catalog_cache.get_version()
+    index = _index
+    if index is None or index.version != version or index.is_expired(now):
+        with _lock:
+            index = _index = load_index(version, now)
+    elif index.is_due(now):
+        with _lock:
+            index.activate(now)
+            index.version = catalog_cache.bump_version()
+    return index
+
+
+def effective_price(product):
+    return get_index().price(product.pk, product.final_price)
+
+
+def effective_prices(products):
+    """
+    {product_id: السعر الفعلي} لمجموعة منتجات بقراءة واحدة لفهرس العروض.
+    تقبل كائنات Product محملة (بدون استعلام) أو أرقام منتجات (استعلام واحد).
+    """
+    products = list(products)
+    if products and not isinstance(products[0], Product):
+        products = Product.objects.filter(pk__in=products).only('pk', 'price', 'discount_percentage')
+    index = get_index()
+    return {product.pk: index.price(product.pk, product.final_price) for product in products}
+
+
+def attach_effective_prices(products):
+    """
+    تسعير صفحة أو سلة كاملة مرة واحدة: يحفظ السعر على كل منتج فيقرأه
+    product.effective_price في القوالب والـ serializers بدون الرجوع للفهرس.
+    """
+    products = list(products)
+    prices = effective_prices(products)
+    for product in products:
+        product._effective_price = prices[product.pk]
+    return products
@@ -0,0 +1,26 @@
+from django.db.models import Min, Q
+
+from orders.services import add_products_to_cart
+from products.models import Product
+
+from .models import Offer
+
+
+def apply_offer_to_cart(cart, offer, product_ids=None):
+    """
+    إضافة منتجات العرض المتاحة (النشطة والمتوفرة) للسلة؛ يمكن حصرها في
+    product_ids. تُرجع المنتجات المضافة وملخص السلة.
+    """
+    products = Product.objects.filter(offers__offer=offer, is_active=True, stock__gt=0)
+    if product_ids is not None:
+        products = products.filter(pk__in=product_ids)
+    return add_products_to_cart(cart, products)
+
+
+def next_offer_boundary(now):
+    """أقرب لحظة يبدأ فيها عرض نشط أو ينتهي، أو None إذا لم يوجد"""
+    bounds = Offer.objects.filter(is_active=True).aggregate(
+        next_start=Min('start_date', filter=Q(start_date__gt=now)),
+        next_end=Min('end_date', filter=Q(end_date__gte=now)),
+    )
+    return min(filter(None, bounds.values()), default=None)
@@ -0,0 +1,14 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from products.catalog_cache import bump_version
+
+from .models import Offer, OfferProduct
+
+
+@receiver(post_save, sender=Offer)
+@receiver(post_delete, sender=Offer)
+@receiver(post_save, sender=OfferProduct)
+@receiver(post_delete, sender=OfferProduct)
+def invalidate_catalog_cache(sender, **kwargs):
+    bump_version()
@@ -1,3 +1,134 @@
-from django.test import TestCase
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import AnonymousUser
+from django.contrib.sessions.backends.cache import SessionStore
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase
+from django.utils import timezone
+
+from orders.models import Cart, CartItem
+from products.models import Category, Product
+from products.page_cache import cache_anonymous_page, page_timeout
+from products.tests import QueryPlanTestCase
+
+from .models import Offer, OfferProduct
+from .pricing import attach_effective_prices, effective_prices, get_index
+from .services import next_offer_boundary
+
+
+class OfferIndexTests(QueryPlanTestCase):
+    def test_live_offers(self):
+        now = timezone.now()
+        self.assertUsesIndex(
+            Offer.objects.filter(is_active=True, start_date__lte=now, end_date__gte=now),
+            'offer_active_window_idx',
+        )
+
+
+class OfferPageCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def create_offer(self, start, end, **kwargs):
+        return Offer.objects.create(title='عرض', description='-', discount_value=10, start_date=start, end_date=end, **kwargs)
+
+    def get(self, view):
+        request = RequestFactory().get('/offers/1/')
+        request.user = AnonymousUser()
+        request.session = SessionStore()
+        return view(request)
+
+    def test_timeout_capped_at_expiry(self):
+        with self.settings(PAGE_CACHE_TIMEOUT=600):
+            response = HttpResponse()
+            self.assertEqual(page_timeout(response), 600)
+            response.page_cache_expires = timezone.now() + timedelta(seconds=30)
+            self.assertIn(page_timeout(response), (29, 30))
+            response.page_cache_expires = timezone.now() - timedelta(seconds=1)
+            self.assertEqual(page_timeout(response), 0)
+
+    def test_page_cached_until_expiry(self):
+        @cache_anonymous_page
+        def view(request):
+            response = HttpResponse('offer')
+            response.page_cache_expires = timezone.now() + timedelta(minutes=5)
+            return response
+
+        self.assertEqual(self.get(view)['X-Page-Cache'], 'MISS')
+        self.assertEqual(self.get(view)['X-Page-Cache'], 'HIT')
+
+    def test_expired_page_is_not_cached(self):
+        @cache_anonymous_page
+        def view(request):
+            response = HttpResponse('offer')
+            response.page_cache_expires = timezone.now() - timedelta(seconds=1)
+            return response
+
+        self.assertNotIn('X-Page-Cache', self.get(view))
+        self.assertNotIn('X-Page-Cache', self.get(view))
+
+    def test_next_offer_boundary(self):
+        now = timezone.now()
+        self.create_offer(now - timedelta(days=1), now + timedelta(hours=5))
+        self.create_offer(now + timedelta(hours=2), now + timedelta(days=3))
+        self.create_offer(now + timedelta(hours=1), now + timedelta(days=3), is_active=False)
+        self.assertEqual(next_offer_boundary(now), now + timedelta(hours=2))
+        self.assertIsNone(next_offer_boundary(now + timedelta(days=4)))
+
+
+class BatchedPricingTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        category = Category.objects.create(name='أجهزة', slug='devices')
+        cls.discounted = Product.objects.create(
+            category=category, name='a', slug='a', description='', price=Decimal('200.00'), discount_percentage=10,
+        )
+        cls.plain = Product.objects.create(category=category, name='b', slug='b', description='', price=Decimal('100.00'))
+        now = timezone.now()
+        offer = Offer.objects.create(
+            title='عرض', description='-', offer_type='fixed', discount_value=50,
+            start_date=now - timedelta(days=1), end_date=now + timedelta(days=1),
+        )
+        OfferProduct.objects.create(offer=offer, product=cls.discounted)
+
+    def setUp(self):
+        cache.clear()
+        # بعد cache.clear يعود رقم الإصدار إلى 1، فقد يبدو فهرس اختبار سابق صالحًا
+        self.enterContext(mock.patch('offers.pricing._index', None))
+        get_index()
+
+    def test_prices_products_and_ids_alike(self):
+        expected = {self.discounted.pk: Decimal('130.00'), self.plain.pk: Decimal('100.00')}
+        with self.assertNumQueries(0):
+            self.assertEqual(effective_prices([self.discounted, self.plain]), expected)
+        with self.assertNumQueries(1):
+            self.assertEqual(effective_prices([self.discounted.pk, self.plain.pk]), expected)
+
+    def test_attached_prices_skip_the_index(self):
+        products = attach_effective_prices(Product.objects.order_by('pk'))
+        with mock.patch('offers.pricing.get_index') as get_index_mock:
+            self.assertEqual([p.effective_price for p in products], [Decimal('130.00'), Decimal('100.00')])
+        get_index_mock.assert_not_called()
+
+    def test_index_reloads_after_max_age(self):
+        # تعديل من عملية أخرى: لا إشارة ولا رفع لرقم الإصدار في هذه العملية
+        Offer.objects.update(discount_value=80)
+        now = timezone.now()
+        with self.settings(CATALOG_CACHE_TIMEOUT=300):
+            self.assertEqual(get_index(now).price(self.discounted.pk, Decimal('180.00')), Decimal('130.00'))
+            index = get_index(now + timedelta(seconds=300))
+        self.assertEqual(index.price(self.discounted.pk, Decimal('180.00')), Decimal('100.00'))
+
+    def test_cart_priced_in_one_pass(self):
+        cart = Cart.objects.create(session_key='k')
+        CartItem.objects.create(cart=cart, product=self.discounted, quantity=2)
+        CartItem.objects.create(cart=cart, product=self.plain, quantity=1)
+        with self.assertNumQueries(1):
+            summary = cart.summary()
+        self.assertEqual(summary, {'total_items': 3, 'total_price': Decimal('360.00')})
+        with self.assertNumQueries(1):
+            items = cart.get_items()
+            self.assertEqual(sum(item.subtotal for item in items), Decimal('360.00'))
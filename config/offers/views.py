@@ -1,22 +1,39 @@
-from django.shortcuts import render, get_object_or_404
+from django.shortcuts import render, redirect, get_object_or_404
 from django.utils import timezone
 from django.contrib import messages
 from django.http import JsonResponse
 from django.views.decorators.http import require_POST
-from django.db.models import Q
-from products.models import Category, Product
+from django.db.models import Count, IntegerField, OuterRef, Prefetch, Q, Subquery, Value
+from django.db.models.functions import Coalesce
+from products import catalog_cache
+from products.models import Category
+from products.page_cache import cache_anonymous_page
+from . import services
+from .pricing import attach_effective_prices
 from .models import Offer, OfferProduct
 from django.http import JsonResponse
 import json
-from orders.models import  Cart, CartItem
+from orders.services import get_cart
 
+# عدد المنتجات المعروضة في بطاقة كل عرض بصفحة العروض
+OFFER_PREVIEW_SIZE = 4
+
+@cache_anonymous_page
 def offers_list(request):
     now = timezone.now()
+    product_count = OfferProduct.objects.filter(offer=OuterRef('pk')).order_by().values('offer').annotate(
+        total=Count('id')
+    ).values('total')
+    preview_products = OfferProduct.objects.select_related('product').order_by('id')[:OFFER_PREVIEW_SIZE]
     offers = Offer.objects.filter(
         is_active=True,
         start_date__lte=now,
         end_date__gte=now
-    ).prefetch_related('products__product')
+    ).annotate(
+        product_count=Coalesce(Subquery(product_count, output_field=IntegerField()), Value(0))
+    ).prefetch_related(
+        Prefetch('products', queryset=preview_products, to_attr='preview_products')
+    )
 
     category_slug = request.GET.get('category')
     if category_slug:
@@ -34,7 +51,7 @@ def offers_list(request):
             Q(products__product__name__icontains=search_query)
         ).distinct()
 
-    categories = Category.objects.filter(is_active=True)
+    categories = catalog_cache.active_categories()
 
     context = {
         'offers': offers,
@@ -42,8 +59,12 @@ def offers_list(request):
         'selected_category': category_slug,
         'search_query': search_query or '',
     }
-    return render(request, 'offers/offers.html', context)
+    response = render(request, 'offers/offers.html', context)
+    # لا تبقى القائمة المخزنة بعد بدء عرض جديد أو انتهاء عرض معروض
+    response.page_cache_expires = services.next_offer_boundary(now)
+    return response
 
+@cache_anonymous_page
 def offer_detail(request, offer_id):
     offer = get_object_or_404(Offer, id=offer_id, is_active=True)
     
@@ -52,13 +73,17 @@ def offer_detail(request, offer_id):
         messages.warning(request, 'هذا العرض غير متاح حالياً')
         return redirect('offers:list')
 
-    offer_products = OfferProduct.objects.filter(offer=offer).select_related('product')
+    offer_products = list(OfferProduct.objects.filter(offer=offer).select_related('product__primary_image', 'product__brand'))
+    attach_effective_prices(offer_product.product for offer_product in offer_products)
     
     context = {
         'offer': offer,
         'offer_products': offer_products,
     }
-    return render(request, 'offers/offer_detail.html', context)
+    response = render(request, 'offers/offer_detail.html', context)
+    # العرض المنتهي لا يُخدم من الكاش بأسعاره المخفضة
+    response.page_cache_expires = offer.end_date
+    return response
 
 @require_POST
 def apply_offer_to_cart(request):
@@ -70,40 +95,18 @@ def apply_offer_to_cart(request):
         if not offer.is_valid():
             return JsonResponse({'success': False, 'message': 'العرض غير متاح'}, status=400)
 
-        # Get or create cart
-        if request.user.is_authenticated:
-            cart, _ = Cart.objects.get_or_create(user=request.user)
-        else:
-            session_key = request.session.session_key
-            if not session_key:
-                request.session.create()
-                session_key = request.session.session_key
-            cart, _ = Cart.objects.get_or_create(session_key=session_key)
+        cart = get_cart(request, create=True)
 
         # Add offer products to cart
-        offer_products = OfferProduct.objects.filter(offer=offer).select_related('product')
-        added_products = []
-        
-        for offer_product in offer_products:
-            product = offer_product.product
-            if product.is_active and product.stock > 0:
-                cart_item, created = CartItem.objects.get_or_create(
-                    cart=cart,
-                    product=product,
-                    defaults={'quantity': 1}
-                )
-                if not created:
-                    cart_item.quantity += 1
-                    cart_item.save()
-                added_products.append(product.name)
+        added_products, summary = services.apply_offer_to_cart(cart, offer)
 
         if added_products:
             messages.success(request, f'تم إضافة {len(added_products)} منتجات إلى السلة')
             return JsonResponse({
                 'success': True,
                 'message': f'تم إضافة {len(added_products)} منتجات إلى السلة',
-                'cart_count': cart.total_items,
-                'cart_total': float(cart.total_price)
+                'cart_count': summary['total_items'],
+                'cart_total': float(summary['total_price'])
             })
         else:
             return JsonResponse({
@@ -119,16 +122,10 @@ def apply_offer_to_cart(request):
 def add_all_offer_products(request, offer_id):
     if request.method == "POST":
         data = json.loads(request.body)
-        products = data.get("products", [])
-
-        cart, created = Cart.objects.get_or_create(user=request.user)
+        product_ids = [p["id"] for p in data.get("products", [])]
 
-        for p in products:
-            product = Product.objects.get(id=p["id"])
-            CartItem.objects.create(
-                cart=cart,
-                product=product,
-                quantity=1
-            )
+        offer = get_object_or_404(Offer, id=offer_id)
+        cart = get_cart(request, create=True)
+        added_products, summary = services.apply_offer_to_cart(cart, offer, product_ids)
 
-        return JsonResponse({"status": "success", "cart_count": cart.items.count()})
\ No newline at end of file
+        return JsonResponse({"status": "success", "cart_count": summary['total_items']})
\ No newline at end of file
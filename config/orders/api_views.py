@@ -3,28 +3,20 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.permissions import IsAuthenticated, AllowAny
+from django.http import Http404
 from django.shortcuts import get_object_or_404
-from .models import Cart, CartItem, Order, OrderItem
+from .filters import OrderFilter
+from .models import Order
+from .pagination import OrderCursorPagination
+from .services import EmptyCartError, get_cart, place_order
 from products.models import Product
 from .serializers import (
     CartSerializer, AddToCartSerializer, UpdateCartQuantitySerializer,
-    RemoveFromCartSerializer, OrderSerializer, CreateOrderSerializer
+    RemoveFromCartSerializer, OrderSerializer, CreateOrderSerializer,
+    get_requested_fields,
 )
 
 
-def get_or_create_cart(request):
-    """دالة مساعدة للحصول على السلة أو إنشائها"""
-    if request.user.is_authenticated:
-        cart, created = Cart.objects.get_or_create(user=request.user)
-    else:
-        session_key = request.session.session_key
-        if not session_key:
-            request.session.create()
-            session_key = request.session.session_key
-        cart, created = Cart.objects.get_or_create(session_key=session_key)
-    return cart
-
-
 class CartAPIView(APIView):
     """
     GET: عرض السلة
@@ -32,7 +24,7 @@ class CartAPIView(APIView):
     permission_classes = [AllowAny]
 
     def get(self, request):
-        cart = get_or_create_cart(request)
+        cart = get_cart(request)
         serializer = CartSerializer(cart)
         return Response({
             'success': True,
@@ -64,17 +56,8 @@ class AddToCartAPIView(APIView):
 
         try:
             product = get_object_or_404(Product, id=product_id, is_active=True)
-            cart = get_or_create_cart(request)
-
-            cart_item, created = CartItem.objects.get_or_create(
-                cart=cart,
-                product=product,
-                defaults={'quantity': quantity}
-            )
-
-            if not created:
-                cart_item.quantity += quantity
-                cart_item.save()
+            cart = get_cart(request, create=True)
+            cart.add_quantities({product.id: quantity})
 
             cart_serializer = CartSerializer(cart)
             
@@ -112,16 +95,11 @@ class UpdateCartQuantityAPIView(APIView):
         quantity = serializer.validated_data['quantity']
 
         try:
-            cart = get_or_create_cart(request)
-            cart_item = get_object_or_404(CartItem, id=item_id, cart=cart)
-
-            if quantity > 0:
-                cart_item.quantity = quantity
-                cart_item.save()
-                item_subtotal = float(cart_item.subtotal)
-            else:
-                cart_item.delete()
-                item_subtotal = 0
+            cart = get_cart(request)
+            cart_item = cart.set_item_quantity(item_id, quantity)
+            if cart_item is None:
+                raise Http404('العنصر غير موجود في السلة')
+            item_subtotal = float(cart_item.subtotal) if quantity > 0 else 0
 
             cart_serializer = CartSerializer(cart)
 
@@ -157,8 +135,8 @@ class RemoveFromCartAPIView(APIView):
         item_id = serializer.validated_data['item_id']
 
         try:
-            cart = get_or_create_cart(request)
-            CartItem.objects.filter(id=item_id, cart=cart).delete()
+            cart = get_cart(request)
+            cart.remove_item(item_id)
 
             cart_serializer = CartSerializer(cart)
 
@@ -183,8 +161,8 @@ class ClearCartAPIView(APIView):
 
     def post(self, request):
         try:
-            cart = get_or_create_cart(request)
-            cart.items.all().delete()
+            cart = get_cart(request)
+            cart.clear()
 
             return Response({
                 'success': True,
@@ -216,50 +194,34 @@ class CreateOrderAPIView(APIView):
             }, status=status.HTTP_400_BAD_REQUEST)
 
         try:
-            cart = get_or_create_cart(request)
-            
-            if not cart.items.exists():
-                return Response({
-                    'success': False,
-                    'message': 'السلة فارغة'
-                }, status=status.HTTP_400_BAD_REQUEST)
-
-            # إنشاء الطلب
-            order = Order.objects.create(
-                user=request.user,
+            cart = get_cart(request)
+
+            # إنشاء الطلب وعناصره ورابط الواتساب وتفريغ السلة في معاملة واحدة
+            order = place_order(
+                request.user,
+                cart,
                 full_name=serializer.validated_data.get('full_name', request.user.full_name),
                 phone=serializer.validated_data.get('phone', request.user.phone),
                 email=serializer.validated_data.get('email', request.user.email or ''),
                 address=serializer.validated_data.get('address', ''),
                 notes=serializer.validated_data.get('notes', ''),
-                total_amount=cart.total_price
             )
 
-            # إضافة المنتجات للطلب
-            for cart_item in cart.items.all():
-                OrderItem.objects.create(
-                    order=order,
-                    product=cart_item.product,
-                    product_name=cart_item.product.name,
-                    quantity=cart_item.quantity,
-                    price=cart_item.product.final_price
-                )
-
-            # توليد رابط الواتساب
-            whatsapp_link = order.generate_whatsapp_link()
-            
-            # تفريغ السلة
-            cart.items.all().delete()
-
             order_serializer = OrderSerializer(order)
 
             return Response({
                 'success': True,
                 'message': 'تم إنشاء الطلب بنجاح',
                 'order': order_serializer.data,
-                'whatsapp_link': whatsapp_link
+                'whatsapp_link': order.whatsapp_link
             }, status=status.HTTP_201_CREATED)
 
+        except EmptyCartError:
+            return Response({
+                'success': False,
+                'message': 'السلة فارغة'
+            }, status=status.HTTP_400_BAD_REQUEST)
+
         except Exception as e:
             return Response({
                 'success': False,
@@ -269,18 +231,29 @@ class CreateOrderAPIView(APIView):
 
 class OrderListAPIView(APIView):
     """
-    GET: عرض طلبات المستخدم
+    GET: عرض طلبات المستخدم على صفحات بمؤشر (?cursor=&page_size=)
+    فلترة اختيارية: ?status=&created_after=&created_before=
+    حقول محددة: ?fields=order_number,status,total_amount (بدون items لا يتم تحميل العناصر)
     """
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        orders = Order.objects.filter(user=request.user).order_by('-created_at')
-        serializer = OrderSerializer(orders, many=True)
-        
-        return Response({
-            'success': True,
-            'orders': serializer.data
-        })
+        filterset = OrderFilter(request.query_params, queryset=Order.objects.filter(user=request.user))
+        if not filterset.is_valid():
+            return Response({
+                'success': False,
+                'errors': filterset.errors
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        fields = get_requested_fields(request, OrderSerializer.Meta.fields)
+        orders = filterset.qs
+        if fields is None or 'items' in fields:
+            orders = orders.prefetch_related('items')
+
+        paginator = OrderCursorPagination()
+        page = paginator.paginate_queryset(orders, request, view=self)
+        serializer = OrderSerializer(page, many=True, context={'fields': fields})
+        return paginator.get_paginated_response(serializer.data)
 
 
 class OrderDetailAPIView(APIView):
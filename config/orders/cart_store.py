@@ -0,0 +1,280 @@
+"""
+Pluggable cart storage.
+
+Cart reads and mutations go through ``get_store()`` (see the Cart methods),
+so views, serializers and checkout work the same against either store:
+
+* ``DatabaseCartStore`` (default): CartItem rows are the source of truth.
+* ``CacheCartStore``: each cart's lines ({product_id: quantity}) live in
+  Django's cache.  Mutations only touch the cache and mark the cart dirty;
+  dirty carts are written to CartItem rows in bulk once
+  ``CART_STORE_FLUSH_INTERVAL`` seconds have passed, at process exit and
+  before checkout.  Items returned by this store are unsaved CartItem objects
+  whose ``id`` is the product id.  It needs a cache shared by all processes
+  (Redis/Memcached), not the per-process locmem default.
+"""
+import atexit
+import logging
+import threading
+import time
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DatabaseError, IntegrityError, connection, transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from offers.pricing import effective_prices
+from products.models import Product
+
+from .models import Cart, CartItem
+
+logger = logging.getLogger(__name__)
+
+
+# الحقول اللازمة للتسعير فقط
+PRICE_FIELDS = ('pk', 'price', 'discount_percentage')
+
+
+def price_lines(lines, products):
+    """{total_items, total_price} من {product_id: quantity} ومنتجاتها، مسعرة كلها مرة واحدة"""
+    prices = effective_prices(products)
+    total_items = 0
+    total_price = Decimal('0.00')
+    for product_id, price in prices.items():
+        quantity = lines[product_id]
+        total_items += quantity
+        total_price += price * quantity
+    return {'total_items': total_items, 'total_price': total_price}
+
+
+class DatabaseCartStore:
+    def touch(self, cart_id):
+        # كل تعديل على البنود يحدّث Cart.updated_at الذي يعتمد عليه purge_carts
+        Cart.objects.filter(pk=cart_id).update(updated_at=timezone.now())
+
+    def lines(self, cart):
+        return dict(cart.items.values_list('product_id', 'quantity'))
+
+    def items(self, cart):
+        return cart.items.select_related('product')
+
+    def is_empty(self, cart):
+        return not cart.items.exists()
+
+    def summary(self, cart):
+        products = list(
+            Product.objects.filter(cartitem__cart=cart)
+            .annotate(cart_quantity=F('cartitem__quantity'))
+            .only(*PRICE_FIELDS)
+        )
+        return price_lines({product.pk: product.cart_quantity for product in products}, products)
+
+    def add(self, cart, quantities):
+        """زيادة الكميات {product_id: quantity}: قراءة الكميات الحالية ثم upsert واحد على (cart, product)"""
+        if not quantities:
+            return
+        with transaction.atomic():
+            # تحديث السلة أولًا يقفل صفها حتى نهاية المعاملة، فتنتظر أي إضافة متزامنة لنفس السلة
+            # قبل قراءة الكميات، حتى لمنتجات ليس لها بنود بعد (select_for_update لا يقفل صفًا غير موجود)
+            self.touch(cart.pk)
+            existing = dict(
+                CartItem.objects.filter(cart=cart, product_id__in=quantities)
+                .values_list('product_id', 'quantity')
+            )
+            CartItem.objects.bulk_create(
+                [
+                    CartItem(cart=cart, product_id=product_id, quantity=existing.get(product_id, 0) + quantity)
+                    for product_id, quantity in quantities.items()
+                ],
+                update_conflicts=True,
+                unique_fields=['cart', 'product'],
+                update_fields=['quantity'],
+            )
+
+    def set_quantity(self, cart, item_id, quantity):
+        item = self.items(cart).filter(id=item_id).first()
+        if item is None:
+            return None
+        if quantity > 0:
+            item.quantity = quantity
+            item.save(update_fields=['quantity'])
+        else:
+            item.delete()
+        self.touch(cart.pk)
+        return item
+
+    def remove(self, cart, item_id):
+        if cart.items.filter(id=item_id).delete()[0]:
+            self.touch(cart.pk)
+
+    def clear(self, cart):
+        cart.items.all().delete()
+        self.touch(cart.pk)
+
+    def persist(self, cart):
+        pass
+
+    def purgeable(self, cart_ids):
+        """من بين سلال يراها purge_carts مهجورة، السلال التي يمكن حذفها بأمان"""
+        return list(cart_ids)
+
+
+class CacheCartStore(DatabaseCartStore):
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._dirty = set()
+        self._last_flush = time.monotonic()
+        # قاعدة البيانات التي عُدلت عليها السلال المعلقة
+        self._database = None
+
+    def key(self, cart_id):
+        return f'cart:{cart_id}:lines'
+
+    def timeout(self):
+        return getattr(settings, 'SESSION_COOKIE_AGE', 1209600)
+
+    def flush_interval(self):
+        return getattr(settings, 'CART_STORE_FLUSH_INTERVAL', 30)
+
+    def lines(self, cart):
+        lines = cache.get(self.key(cart.pk))
+        if lines is None:
+            lines = super().lines(cart)
+            cache.set(self.key(cart.pk), lines, self.timeout())
+        return lines
+
+    def save_lines(self, cart, lines):
+        cache.set(self.key(cart.pk), lines, self.timeout())
+        with self._lock:
+            self._dirty.add(cart.pk)
+            self._database = connection.settings_dict['NAME']
+            due = time.monotonic() - self._last_flush >= self.flush_interval()
+        if due:
+            self.flush()
+
+    def items(self, cart):
+        lines = self.lines(cart)
+        products = Product.objects.in_bulk(list(lines))
+        return [
+            CartItem(id=product_id, cart=cart, product=products[product_id], quantity=quantity)
+            for product_id, quantity in lines.items()
+            if product_id in products
+        ]
+
+    def is_empty(self, cart):
+        return not self.lines(cart)
+
+    def summary(self, cart):
+        lines = self.lines(cart)
+        if not lines:
+            return price_lines({}, [])
+        return price_lines(lines, Product.objects.filter(pk__in=lines).only(*PRICE_FIELDS))
+
+    def add(self, cart, quantities):
+        if not quantities:
+            return
+        lines = dict(self.lines(cart))
+        for product_id, quantity in quantities.items():
+            lines[product_id] = lines.get(product_id, 0) + quantity
+        self.save_lines(cart, lines)
+
+    def set_quantity(self, cart, item_id, quantity):
+        item_id = int(item_id)
+        lines = dict(self.lines(cart))
+        product = Product.objects.filter(pk=item_id).first() if item_id in lines else None
+        if product is None:
+            return None
+        if quantity > 0:
+            lines[item_id] = quantity
+        else:
+            del lines[item_id]
+        self.save_lines(cart, lines)
+        return CartItem(id=item_id, cart=cart, product=product, quantity=quantity)
+
+    def remove(self, cart, item_id):
+        lines = dict(self.lines(cart))
+        if lines.pop(int(item_id), None) is not None:
+            self.save_lines(cart, lines)
+
+    def clear(self, cart):
+        cache.set(self.key(cart.pk), {}, self.timeout())
+        with self._lock:
+            self._dirty.discard(cart.pk)
+        super().clear(cart)
+
+    def persist(self, cart):
+        with self._lock:
+            self._dirty.discard(cart.pk)
+        self.write(cart.pk)
+
+    def write(self, cart_id):
+        """نسخ بنود السلة من الكاش إلى CartItem: حذف المنتجات المحذوفة وupsert للباقي"""
+        lines = cache.get(self.key(cart_id))
+        if lines is None:
+            return
+        with transaction.atomic():
+            CartItem.objects.filter(cart_id=cart_id).exclude(product_id__in=lines).delete()
+            CartItem.objects.bulk_create(
+                [
+                    CartItem(cart_id=cart_id, product_id=product_id, quantity=quantity)
+                    for product_id, quantity in lines.items()
+                ],
+                update_conflicts=True,
+                unique_fields=['cart', 'product'],
+                update_fields=['quantity'],
+            )
+            self.touch(cart_id)
+
+    def purgeable(self, cart_ids):
+        # تعديلات هذه العملية تُكتب أولًا؛ وأي سلة لها نسخة حية في الكاش استُخدمت مؤخرًا
+        # وقد تحمل تعديلات عملية أخرى لم تُكتب بعد، فلا تُحذف حتى لا تعيد الكتابة المؤجلة إنشاءها أو تضيع
+        self.flush()
+        live = cache.get_many([self.key(cart_id) for cart_id in cart_ids])
+        return [cart_id for cart_id in cart_ids if self.key(cart_id) not in live]
+
+    def flush(self):
+        """كتابة كل السلال المعدلة إلى قاعدة البيانات؛ تُرجع عدد السلال المكتوبة"""
+        with self._lock:
+            dirty = set(self._dirty)
+            self._dirty.clear()
+            self._last_flush = time.monotonic()
+        written = 0
+        for cart_id in dirty:
+            try:
+                self.write(cart_id)
+            except IntegrityError:
+                # السلة حُذفت (مثلاً بأمر purge_carts) قبل الكتابة
+                logger.warning('Dropping cached lines of missing cart %s', cart_id)
+            except DatabaseError:
+                logger.exception('Failed to write cart %s, re-queueing', cart_id)
+                with self._lock:
+                    self._dirty.add(cart_id)
+            else:
+                written += 1
+        return written
+
+
+_store = None
+_store_path = None
+
+
+def get_store():
+    global _store, _store_path
+    path = getattr(settings, 'CART_STORE', 'orders.cart_store.DatabaseCartStore')
+    if _store is None or path != _store_path:
+        _store = import_string(path)()
+        _store_path = path
+    return _store
+
+
+def flush():
+    # عند الخروج بعد الاختبارات يعود الاتصال إلى القاعدة الحقيقية: لا تُكتب فيها سلال قاعدة الاختبار
+    if isinstance(_store, CacheCartStore) and _store._database == connection.settings_dict['NAME']:
+        return _store.flush()
+    return 0
+
+
+atexit.register(flush)
@@ -0,0 +1,13 @@
+import django_filters
+
+from .models import Order
+
+
+class OrderFilter(django_filters.FilterSet):
+    """?status=pending&created_after=2025-01-01&created_before=2025-01-31"""
+    status = django_filters.ChoiceFilter(choices=Order.STATUS_CHOICES)
+    created = django_filters.DateFromToRangeFilter(field_name='created_at')
+
+    class Meta:
+        model = Order
+        fields = ['status', 'created']
@@ -0,0 +1,68 @@
+import time
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from rest_framework import serializers
+
+from orders.models import Cart, CartItem, Order, OrderItem
+from orders.serializers import CartSerializer, OrderSerializer
+from products.models import Category, Product
+from users.models import CustomUser
+
+
+def generic(serializer_class, instance):
+    """المسار العام لـ DRF (حقل لكل قيمة) للمقارنة مع التمثيل السريع"""
+    serializer = serializer_class(instance)
+    return serializers.ModelSerializer.to_representation(serializer, instance)
+
+
+class Command(BaseCommand):
+    help = 'Benchmark cart and order serialization for carts of different sizes (data is rolled back)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=int, nargs='+', default=[1, 20, 200])
+        parser.add_argument('--repeat', type=int, default=50)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            self.run(options['sizes'], options['repeat'])
+            transaction.set_rollback(True)
+
+    def run(self, sizes, repeat):
+        category = Category.objects.create(name='bench', slug='bench-serializers')
+        products = Product.objects.bulk_create([
+            Product(
+                category=category, name=f'bench {i}', slug=f'bench-serializers-{i}',
+                description='', price=Decimal('100.00') + i, discount_percentage=i % 30,
+            )
+            for i in range(max(sizes))
+        ])
+        user = CustomUser.objects.create_user(phone='bench', password=None, full_name='bench')
+
+        self.stdout.write(f'{"object":<8}{"items":>7}{"lean ms":>10}{"queries":>9}{"DRF ms":>10}{"queries":>9}')
+        for size in sizes:
+            cart = Cart.objects.create(session_key=f'bench-{size}')
+            CartItem.objects.bulk_create([CartItem(cart=cart, product=p, quantity=2) for p in products[:size]])
+            order = Order.objects.create(user=user, full_name='bench', phone='0', address='-')
+            OrderItem.objects.bulk_create([
+                OrderItem(order=order, product=p, product_name=p.name, quantity=2, price=p.price)
+                for p in products[:size]
+            ])
+
+            self.report('cart', size, repeat, lambda: CartSerializer(cart).data, lambda: generic(CartSerializer, cart))
+            self.report('order', size, repeat, lambda: OrderSerializer(order).data, lambda: generic(OrderSerializer, order))
+
+    def report(self, label, size, repeat, lean, drf):
+        lean_ms, lean_queries = self.measure(lean, repeat)
+        drf_ms, drf_queries = self.measure(drf, repeat)
+        self.stdout.write(f'{label:<8}{size:>7}{lean_ms:>10.2f}{lean_queries:>9}{drf_ms:>10.2f}{drf_queries:>9}')
+
+    def measure(self, func, repeat):
+        with CaptureQueriesContext(connection) as queries:
+            func()
+        start = time.perf_counter()
+        for _ in range(repeat):
+            func()
+        return (time.perf_counter() - start) * 1000 / repeat, len(queries)
@@ -0,0 +1,23 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from orders.services import purge_abandoned_carts
+
+
+class Command(BaseCommand):
+    help = 'Delete anonymous carts (and their items) that have not been used for a while, in batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days', type=int, default=getattr(settings, 'CART_ABANDONED_DAYS', 30),
+            help='Carts idle for more than this many days are purged',
+        )
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        before = timezone.now() - timedelta(days=options['days'])
+        deleted = purge_abandoned_carts(before, batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Purged {deleted} abandoned carts'))
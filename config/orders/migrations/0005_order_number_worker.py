@@ -0,0 +1,26 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0004_order_user_recent_idx_id'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OrderNumberWorker',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('hostname', models.CharField(max_length=255, verbose_name='الخادم')),
+                ('pid', models.PositiveIntegerField(verbose_name='رقم العملية')),
+                ('started_at', models.DateTimeField(auto_now_add=True, verbose_name='وقت التشغيل')),
+            ],
+            options={
+                'verbose_name': 'معرف عامل أرقام الطلبات',
+                'verbose_name_plural': 'معرفات عمال أرقام الطلبات',
+            },
+        ),
+    ]
@@ -1,7 +1,10 @@
+from decimal import Decimal
+
 from django.db import models
 from django.utils import timezone
 from users.models import CustomUser
 from products.models import Product
+from .numbering import next_order_number
 
 
 # ========================
@@ -17,19 +20,79 @@ class Cart(models.Model):
         verbose_name = 'سلة تسوق'
         verbose_name_plural = 'سلال التسوق'
         ordering = ['-created_at']
+        indexes = [
+            models.Index(
+                fields=['session_key'],
+                name='cart_session_key_idx',
+                condition=models.Q(session_key__isnull=False),
+            ),
+        ]
 
     def __str__(self):
         if self.user:
             return f"سلة {self.user.full_name}"
         return f"سلة جلسة {self.session_key}"
 
+    # القراءة والتعديل عبر مخزن السلة (قاعدة البيانات أو الكاش، حسب CART_STORE)
+    @property
+    def store(self):
+        from .cart_store import get_store
+        return get_store()
+
+    def get_items(self):
+        """عناصر السلة مع المنتجات في استعلام واحد، مسعرة كلها بقراءة واحدة لفهرس العروض"""
+        if self.pk is None:
+            return []
+        from offers.pricing import attach_effective_prices
+        items = list(self.store.items(self))
+        attach_effective_prices(item.product for item in items)
+        return items
+
+    def get_lines(self):
+        """{product_id: quantity}"""
+        if self.pk is None:
+            return {}
+        return self.store.lines(self)
+
+    def is_empty(self):
+        return self.pk is None or self.store.is_empty(self)
+
+    def summary(self):
+        """عدد القطع والإجمالي بالسعر الفعلي (بعد الخصم والعروض)"""
+        if self.pk is None:
+            return {'total_items': 0, 'total_price': Decimal('0.00')}
+        return self.store.summary(self)
+
+    def add_quantities(self, quantities):
+        """إضافة كميات {product_id: quantity} فوق الموجود في السلة"""
+        self.store.add(self, quantities)
+
+    def set_item_quantity(self, item_id, quantity):
+        """تعديل كمية عنصر (الحذف عند 0)؛ يُرجع العنصر أو None إذا لم يكن في السلة"""
+        if self.pk is None:
+            return None
+        return self.store.set_quantity(self, item_id, quantity)
+
+    def remove_item(self, item_id):
+        if self.pk is not None:
+            self.store.remove(self, item_id)
+
+    def clear(self):
+        if self.pk is not None:
+            self.store.clear(self)
+
+    def persist(self):
+        """كتابة أي تعديلات مؤجلة في مخزن السلة إلى CartItem"""
+        if self.pk is not None:
+            self.store.persist(self)
+
     @property
     def total_price(self):
-        return sum(item.subtotal for item in self.items.all())
+        return self.summary()['total_price']
 
     @property
     def total_items(self):
-        return sum(item.quantity for item in self.items.all())
+        return self.summary()['total_items']
 
 
 class CartItem(models.Model):
@@ -48,8 +111,8 @@ class CartItem(models.Model):
 
     @property
     def subtotal(self):
-        """السعر الكلي = سعر المنتج × الكمية"""
-        price = getattr(self.product, 'price', 0) or 0
+        """السعر الكلي = السعر الفعلي للمنتج × الكمية"""
+        price = getattr(self.product, 'effective_price', 0) or 0
         quantity = self.quantity or 0
         return price * quantity
 
@@ -82,6 +145,9 @@ class Order(models.Model):
         verbose_name = 'طلب'
         verbose_name_plural = 'الطلبات'
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['user', '-created_at', '-id'], name='order_user_recent_idx'),
+        ]
 
     def __str__(self):
         return f"طلب #{self.order_number} - {self.user.full_name}"
@@ -89,10 +155,13 @@ class Order(models.Model):
     def save(self, *args, **kwargs):
         """توليد رقم الطلب تلقائيًا"""
         if not self.order_number:
-            import random, string
-            self.order_number = 'EM' + ''.join(random.choices(string.digits, k=8))
+            self.order_number = self.generate_order_number()
         super().save(*args, **kwargs)
 
+    @staticmethod
+    def generate_order_number():
+        return next_order_number()
+
     def calculate_total(self):
         """حساب إجمالي الطلب من عناصره"""
         total = sum(item.subtotal for item in self.items.all())
@@ -109,6 +178,12 @@ class Order(models.Model):
 
     def generate_whatsapp_link(self):
         """توليد رابط واتساب للطلب"""
+        self.whatsapp_link = self.build_whatsapp_link(self.items.all())
+        self.save()
+        return self.whatsapp_link
+
+    def build_whatsapp_link(self, items):
+        """بناء رابط واتساب من عناصر الطلب المعطاة بدون حفظ أو استعلامات"""
         company_phone = '+201013928114'
         message = f"طلب جديد من Entity Medical\n"
         message += f"رقم الطلب: {self.order_number}\n"
@@ -117,16 +192,14 @@ class Order(models.Model):
         message += f"العنوان: {self.address}\n\n"
         message += "تفاصيل الطلب:\n"
 
-        for item in self.items.all():
+        for item in items:
             message += f"• {item.product_name} x {item.quantity} = {item.subtotal} جنيه\n"
 
         message += f"\nالمبلغ الإجمالي: {self.total_amount} جنيه"
 
         from urllib.parse import quote
         encoded_message = quote(message)
-        self.whatsapp_link = f"https://wa.me/{company_phone.replace('+', '')}?text={encoded_message}"
-        self.save()
-        return self.whatsapp_link
+        return f"https://wa.me/{company_phone.replace('+', '')}?text={encoded_message}"
 
 
 class OrderItem(models.Model):
@@ -148,4 +221,20 @@ class OrderItem(models.Model):
         """إجمالي سعر هذا المنتج في الطلب"""
         price = self.price or 0
         quantity = self.quantity or 0
-        return price * quantity
\ No newline at end of file
+        return price * quantity
+
+class OrderNumberWorker(models.Model):
+    """
+    حجز معرف عامل لمولد أرقام الطلبات: كل عملية تضيف صفًا عند أول طلب
+    ويكون معرفها id % 256، فلا يتكرر المعرف بين العمليات الحية إلا بعد 256 تشغيلًا جديدًا.
+    """
+    hostname = models.CharField(max_length=255, verbose_name='الخادم')
+    pid = models.PositiveIntegerField(verbose_name='رقم العملية')
+    started_at = models.DateTimeField(auto_now_add=True, verbose_name='وقت التشغيل')
+
+    class Meta:
+        verbose_name = 'معرف عامل أرقام الطلبات'
+        verbose_name_plural = 'معرفات عمال أرقام الطلبات'
+
+    def __str__(self):
+        return f'{self.hostname}:{self.pid}'
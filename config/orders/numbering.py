@@ -0,0 +1,136 @@
+"""
+Order number generators.
+
+``Order.generate_order_number`` delegates to the generator named by the
+``ORDER_NUMBER_GENERATOR`` setting.  The default produces time-ordered numbers
+that are unique without asking the database, so new rows are always appended
+to the end of the unique index on ``order_number``.
+"""
+import os
+import random
+import socket
+import string
+import threading
+import time
+from datetime import datetime, timezone
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.utils.module_loading import import_string
+
+PREFIX = 'EM'
+
+
+class RandomOrderNumberGenerator:
+    """The original scheme: 'EM' + 8 random digits. Not collision-free."""
+
+    def __call__(self):
+        return PREFIX + ''.join(random.choices(string.digits, k=8))
+
+
+class TimeOrderedOrderNumberGenerator:
+    """
+    Snowflake-style numbers: milliseconds since ``EPOCH``, a worker id and a
+    per-millisecond sequence packed into one integer and zero-padded to a fixed
+    width, so string order matches creation order.
+
+    Uniqueness holds as long as concurrently running processes have distinct
+    worker ids.  Each process reserves one on its first order from the
+    OrderNumberWorker table (an auto-increment counter shared by every host),
+    so ids only repeat after 256 newer processes have started.  A fixed
+    ``ORDER_NUMBER_WORKER_ID`` is only safe for a single-process deployment.
+    """
+    EPOCH = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    WORKER_BITS = 8
+    SEQUENCE_BITS = 10
+    WIDTH = 18  # 'EM' + 18 أرقام = 20 حرفًا وهو طول حقل order_number
+
+    def __init__(self, worker_id=None):
+        self._configured_worker_id = worker_id
+        self._epoch_ms = int(self.EPOCH.timestamp() * 1000)
+        self._lock = threading.Lock()
+        self._pid = None
+        self._last_ms = -1
+        self._sequence = 0
+
+    def _worker_id(self):
+        worker_id = self._configured_worker_id
+        if worker_id is None:
+            worker_id = getattr(settings, 'ORDER_NUMBER_WORKER_ID', None)
+        if worker_id is None:
+            return self._reserve_worker_id()
+        if not 0 <= worker_id < 1 << self.WORKER_BITS:
+            raise ImproperlyConfigured(
+                f'ORDER_NUMBER_WORKER_ID must be between 0 and {(1 << self.WORKER_BITS) - 1}, got {worker_id!r}'
+            )
+        return worker_id
+
+    def _reserve_worker_id(self):
+        from .models import OrderNumberWorker
+
+        slots = 1 << self.WORKER_BITS
+        worker = OrderNumberWorker.objects.create(hostname=socket.gethostname(), pid=os.getpid())
+        # الصفوف الأقدم من آخر 256 حجزًا لم تعد تميز أي عملية
+        OrderNumberWorker.objects.filter(pk__lte=worker.pk - slots).delete()
+        return worker.pk % slots
+
+    def _now_ms(self):
+        return int(time.time() * 1000) - self._epoch_ms
+
+    def _ensure_worker(self):
+        if self._pid != os.getpid():
+            # عملية جديدة بعد fork: حالة جديدة ومعرف عامل جديد
+            self._worker = self._worker_id()
+            self._pid = os.getpid()
+            self._last_ms = -1
+
+    def reserve(self):
+        """
+        Reserve this process's worker id now.  Called at the start of every
+        request so the reservation is committed on its own, outside the order's
+        transaction: a reservation rolled back with a failed order could be
+        handed out again to another live process.
+        """
+        with self._lock:
+            self._ensure_worker()
+
+    def __call__(self):
+        with self._lock:
+            self._ensure_worker()
+
+            now = max(self._now_ms(), self._last_ms)  # لا نرجع للخلف إذا تأخرت الساعة
+            if now == self._last_ms:
+                self._sequence += 1
+                if self._sequence >> self.SEQUENCE_BITS:
+                    now += 1
+                    self._sequence = 0
+            else:
+                self._sequence = 0
+            self._last_ms = now
+
+            value = (
+                (now << (self.WORKER_BITS + self.SEQUENCE_BITS))
+                | (self._worker << self.SEQUENCE_BITS)
+                | self._sequence
+            )
+        return f'{PREFIX}{value:0{self.WIDTH}d}'
+
+
+_generator = None
+_generator_path = None
+
+
+def get_generator():
+    global _generator, _generator_path
+    path = getattr(
+        settings, 'ORDER_NUMBER_GENERATOR',
+        'orders.numbering.TimeOrderedOrderNumberGenerator',
+    )
+    if _generator is None or path != _generator_path:
+        _generator = import_string(path)()
+        _generator_path = path
+    return _generator
+
+
+def next_order_number():
+    return get_generator()()
@@ -0,0 +1,18 @@
+from rest_framework.pagination import CursorPagination
+from rest_framework.response import Response
+
+
+class OrderCursorPagination(CursorPagination):
+    """صفحات الطلبات بمؤشر (created_at, id) بدل OFFSET حتى تبقى الصفحات البعيدة سريعة"""
+    ordering = ('-created_at', '-id')
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+    def get_paginated_response(self, data):
+        return Response({
+            'success': True,
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'orders': data,
+        })
@@ -1,4 +1,6 @@
 # orders/serializers.py
+from decimal import Decimal
+
 from rest_framework import serializers
 from .models import Cart, CartItem, Order, OrderItem
 from products.models import Product
@@ -23,15 +25,21 @@ class CartItemSerializer(serializers.ModelSerializer):
 
 
 class CartSerializer(serializers.ModelSerializer):
-    """Serializer للسلة"""
-    items = CartItemSerializer(many=True, read_only=True)
+    """
+    Serializer للسلة. الحقول المعرفة هنا للتوثيق والتحقق فقط؛ التمثيل نفسه
+    يُبنى في cart_data من قراءة واحدة لعناصر السلة بدون حقول DRF لكل عنصر.
+    """
+    items = CartItemSerializer(many=True, read_only=True, source='get_items')
     total_items = serializers.IntegerField(read_only=True)
-    total_price = serializers.DecimalField(max_digits=10, decimal_places=2, read_only=True)
+    total_price = serializers.DecimalField(max_digits=12, decimal_places=2, read_only=True)
     
     class Meta:
         model = Cart
         fields = ['id', 'items', 'total_items', 'total_price', 'created_at', 'updated_at']
 
+    def to_representation(self, instance):
+        return cart_data(instance)
+
 
 class AddToCartSerializer(serializers.Serializer):
     """Serializer لإضافة منتج للسلة"""
@@ -65,7 +73,7 @@ class OrderItemSerializer(serializers.ModelSerializer):
 
 
 class OrderSerializer(serializers.ModelSerializer):
-    """Serializer للطلبات"""
+    """Serializer للطلبات؛ التمثيل يُبنى في order_data (استخدم prefetch_related('items') مع القوائم)"""
     items = OrderItemSerializer(many=True, read_only=True)
     
     class Meta:
@@ -77,6 +85,9 @@ class OrderSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ['order_number', 'user', 'status', 'created_at', 'updated_at']
 
+    def to_representation(self, instance):
+        return order_data(instance, self.context.get('fields'))
+
 
 class CreateOrderSerializer(serializers.Serializer):
     """Serializer لإنشاء طلب جديد"""
@@ -84,4 +95,89 @@ class CreateOrderSerializer(serializers.Serializer):
     phone = serializers.CharField(max_length=20, required=False)
     email = serializers.EmailField(required=False)
     address = serializers.CharField(required=False)
-    notes = serializers.CharField(required=False, allow_blank=True)
\ No newline at end of file
+    notes = serializers.CharField(required=False, allow_blank=True)
+
+# ========================
+# تمثيل سريع للقراءة
+# ========================
+# نفس مخرجات الـ Serializers أعلاه لكن مبنية مباشرة من الكائنات المحملة:
+# عناصر السلة مع منتجاتها من قراءة واحدة، والإجماليات من نفس المرور بدلاً من
+# استعلام ملخص منفصل، وبدون تكلفة حقول DRF لكل عنصر.
+_money = serializers.DecimalField(max_digits=12, decimal_places=2)
+_datetime = serializers.DateTimeField()
+
+
+def _format_datetime(value):
+    return _datetime.to_representation(value) if value is not None else None
+
+
+def cart_data(cart):
+    items = []
+    total_items = 0
+    total_price = Decimal('0.00')
+    for item in cart.get_items():
+        product = item.product
+        subtotal = product.effective_price * item.quantity
+        total_items += item.quantity
+        total_price += subtotal
+        items.append({
+            'id': item.id,
+            'product': {
+                'id': product.id,
+                'name': product.name,
+                'slug': product.slug,
+                'price': _money.to_representation(product.price),
+                'final_price': product.final_price,
+                'is_active': product.is_active,
+            },
+            'quantity': item.quantity,
+            'subtotal': _money.to_representation(subtotal),
+        })
+    return {
+        'id': cart.id,
+        'items': items,
+        'total_items': total_items,
+        'total_price': _money.to_representation(total_price),
+        'created_at': _format_datetime(cart.created_at),
+        'updated_at': _format_datetime(cart.updated_at),
+    }
+
+
+def get_requested_fields(request, allowed):
+    """?fields=a,b → الحقول المطلوبة من ``allowed`` بنفس ترتيبها، أو None لكل الحقول"""
+    requested = request.query_params.get('fields')
+    if not requested:
+        return None
+    requested = {name.strip() for name in requested.split(',')}
+    return [name for name in allowed if name in requested] or None
+
+
+def order_data(order, fields=None):
+    """تمثيل الطلب؛ ``fields`` يحدد الحقول المطلوبة ولا تُقرأ العناصر إلا إذا طُلبت"""
+    data = {
+        'id': order.id,
+        'order_number': order.order_number,
+        'user': order.user_id,
+        'full_name': order.full_name,
+        'phone': order.phone,
+        'email': order.email,
+        'address': order.address,
+        'notes': order.notes,
+        'total_amount': _money.to_representation(order.total_amount),
+        'status': order.status,
+        'items': [
+            {
+                'id': item.id,
+                'product_name': item.product_name,
+                'quantity': item.quantity,
+                'price': _money.to_representation(item.price),
+                'subtotal': item.subtotal,
+            }
+            for item in order.items.all()
+        ] if fields is None or 'items' in fields else None,
+        'created_at': _format_datetime(order.created_at),
+        'updated_at': _format_datetime(order.updated_at),
+    }
+    if fields is None:
+        return data
+    return {name: data[name] for name in fields}
@@ -0,0 +1,145 @@
+import secrets
+
+from django.db import transaction
+
+from .models import Cart, CartItem, Order, OrderItem
+
+
+# مفتاح سلة الزائر داخل بيانات الجلسة؛ ثابت مع أي محرك جلسات (حتى signed_cookies)
+# وينتقل مع الجلسة عند تسجيل الدخول بعكس session_key الذي يتغير
+CART_SESSION_KEY = 'cart_key'
+
+
+class EmptyCartError(Exception):
+    """السلة لا تحتوي على منتجات"""
+
+
+def get_cart_key(session, create=False):
+    """
+    مفتاح سلة الزائر من الجلسة. القراءة لا تنشئ جلسة ولا تكتب فيها؛
+    create=True (عند إضافة منتج فعلاً) يولد مفتاحًا جديدًا ويحفظه في الجلسة.
+    """
+    cart_key = session.get(CART_SESSION_KEY)
+    if cart_key is None and create:
+        cart_key = session[CART_SESSION_KEY] = secrets.token_hex(20)
+    return cart_key
+
+
+def get_cart(request, create=False):
+    """
+    سلة الطلب الحالي، تُحل مرة واحدة لكل طلب (باستعلام واحد على الأكثر) وتُحفظ عليه.
+    القراءة (create=False) لا تنشئ سلة ولا جلسة: تُرجع سلة فارغة غير محفوظة.
+    create=True يحفظ هذه السلة نفسها عند الحاجة، فيبقى الكائن المحفوظ على الطلب صالحًا.
+    """
+    user = request.user
+    request = getattr(request, '_request', request)  # DRF Request يغلف HttpRequest
+    cart = getattr(request, '_cart', None)
+    if cart is None:
+        if user.is_authenticated:
+            cart = Cart.objects.filter(user=user).first() or Cart(user=user)
+        else:
+            cart_key = get_cart_key(request.session)
+            cart = Cart.objects.filter(session_key=cart_key).first() if cart_key else None
+            cart = cart or Cart(session_key=cart_key)
+        request._cart = cart
+    if create and cart.pk is None:
+        if cart.user_id is None:
+            cart.session_key = get_cart_key(request.session, create=True)
+        cart.save()
+    return cart
+
+
+def place_order(user, cart, full_name, phone, email='', address='', notes=''):
+    """
+    إنشاء طلب من السلة في معاملة واحدة:
+    قراءة عناصر السلة مع المنتجات باستعلام واحد، حساب الإجمالي ورابط واتساب
+    من البيانات في الذاكرة، حفظ الطلب مرة واحدة، إضافة العناصر بـ bulk_create
+    ثم تفريغ السلة.
+    """
+    with transaction.atomic():
+        # مع CacheCartStore تُكتب البنود المؤجلة إلى CartItem قبل إنشاء الطلب
+        cart.persist()
+        cart_items = list(cart.get_items())
+        if not cart_items:
+            raise EmptyCartError('السلة فارغة')
+
+        order = Order(
+            user=user,
+            order_number=Order.generate_order_number(),
+            full_name=full_name,
+            phone=phone,
+            email=email,
+            address=address,
+            notes=notes,
+        )
+        order_items = [
+            OrderItem(
+                order=order,
+                product=cart_item.product,
+                product_name=cart_item.product.name,
+                quantity=cart_item.quantity,
+                price=cart_item.product.effective_price,
+            )
+            for cart_item in cart_items
+        ]
+        order.total_amount = sum(item.subtotal for item in order_items)
+        order.whatsapp_link = order.build_whatsapp_link(order_items)
+        order.save()
+
+        OrderItem.objects.bulk_create(order_items)
+        cart.clear()
+
+    return order
+
+
+def add_products_to_cart(cart, products, quantity=1):
+    """
+    إضافة مجموعة منتجات للسلة دفعة واحدة بدلاً من get_or_create + save لكل منتج.
+    تُرجع المنتجات المضافة وملخص السلة من نفس المعاملة.
+    """
+    with transaction.atomic():
+        products = list(products)
+        cart.add_quantities({product.pk: quantity for product in products})
+        summary = cart.summary()
+    return products, summary
+
+
+def merge_carts(source, target):
+    """
+    دمج سلة الزائر في سلة المستخدم بعد تسجيل الدخول: جمع الكميات بـ upsert واحد
+    ثم حذف سلة الزائر وعناصرها.
+    """
+    with transaction.atomic():
+        quantities = source.get_lines()
+        target.add_quantities(quantities)
+        source.clear()
+        source.delete()
+    return len(quantities)
+
+
+def purge_abandoned_carts(before, batch_size=1000):
+    """
+    حذف سلال الزوار التي لم تُستخدم منذ ``before`` على دفعات، كل دفعة في معاملة
+    مستقلة حتى لا تُقفل الجداول لفترة طويلة. تُرجع عدد السلال المحذوفة.
+    """
+    from .cart_store import get_store
+
+    # updated_at يتحدث مع كل تعديل على بنود السلة (انظر cart_store)
+    abandoned = (
+        Cart.objects.filter(user__isnull=True, updated_at__lt=before)
+        .order_by('pk')
+        .values_list('pk', flat=True)
+    )
+    store = get_store()
+    deleted = 0
+    last_pk = 0
+    while True:
+        with transaction.atomic():
+            batch = list(abandoned.filter(pk__gt=last_pk)[:batch_size])
+            if not batch:
+                return deleted
+            last_pk = batch[-1]
+            cart_ids = store.purgeable(batch)
+            CartItem.objects.filter(cart_id__in=cart_ids).delete()
+            Cart.objects.filter(pk__in=cart_ids).delete()
+        deleted += len(cart_ids)
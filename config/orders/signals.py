@@ -0,0 +1,37 @@
+from django.contrib.auth.signals import user_logged_in
+from django.core.signals import request_started
+from django.dispatch import receiver
+
+from .models import Cart
+from .numbering import get_generator
+from .services import CART_SESSION_KEY, merge_carts
+
+
+@receiver(user_logged_in)
+def merge_session_cart(sender, request, user, **kwargs):
+    """نقل سلة الزائر إلى المستخدم عند تسجيل الدخول بدل تركها يتيمة وإنشاء سلة ثانية."""
+    session = getattr(request, 'session', None)
+    if session is None:
+        return
+    cart_key = session.pop(CART_SESSION_KEY, None)
+    if cart_key is None:
+        return
+    session_cart = Cart.objects.filter(session_key=cart_key, user__isnull=True).first()
+    if session_cart is None:
+        return
+    user_cart = Cart.objects.filter(user=user).first()
+    if user_cart is None:
+        # لا توجد سلة للمستخدم: تصبح سلة الزائر سلته بتحديث واحد
+        session_cart.user = user
+        session_cart.session_key = None
+        session_cart.save(update_fields=['user', 'session_key', 'updated_at'])
+        return
+    merge_carts(session_cart, user_cart)
+
+
+@receiver(request_started)
+def reserve_order_number_worker(sender, **kwargs):
+    """حجز معرف العامل في أول طلب لكل عملية، خارج معاملة إنشاء الطلب."""
+    reserve = getattr(get_generator(), 'reserve', None)
+    if reserve is not None:
+        reserve()
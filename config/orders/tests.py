@@ -1,3 +1,297 @@
-from django.test import TestCase
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock
+from urllib.parse import unquote
 
-# Create your tests here.
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from offers.pricing import get_index
+from products.models import Category, Product
+from products.tests import QueryPlanTestCase
+from users.models import CustomUser
+
+from .models import Cart, CartItem, Order, OrderItem, OrderNumberWorker
+from . import cart_store
+from .cart_store import get_store
+from .numbering import TimeOrderedOrderNumberGenerator
+from .services import CART_SESSION_KEY, EmptyCartError, get_cart_key, place_order, purge_abandoned_carts
+
+
+class OrderIndexTests(QueryPlanTestCase):
+    def test_user_orders(self):
+        user = CustomUser.objects.create_user('01000000000', full_name='مستخدم')
+        self.assertUsesIndex(
+            Order.objects.filter(user=user).order_by('-created_at', '-id'),
+            'order_user_recent_idx',
+        )
+
+    def test_session_cart(self):
+        self.assertUsesIndex(
+            Cart.objects.filter(session_key='abc'),
+            'cart_session_key_idx',
+        )
+
+
+class OrderNumberTests(TestCase):
+    def test_worker_ids_are_reserved_per_process(self):
+        first = TimeOrderedOrderNumberGenerator()
+        second = TimeOrderedOrderNumberGenerator()
+        first.reserve()
+        second.reserve()
+        self.assertNotEqual(first._worker, second._worker)
+        self.assertEqual(OrderNumberWorker.objects.count(), 2)
+
+    def test_numbers_are_unique_and_ordered(self):
+        generator = TimeOrderedOrderNumberGenerator()
+        numbers = [generator() for _ in range(3000)]
+        self.assertEqual(len(set(numbers)), len(numbers))
+        self.assertEqual(numbers, sorted(numbers))
+        self.assertTrue(all(len(number) == 20 for number in numbers))
+
+    def test_fixed_worker_id_is_validated(self):
+        with self.assertRaises(ImproperlyConfigured):
+            TimeOrderedOrderNumberGenerator(worker_id=256)()
+
+
+class DatabaseCartStoreTests(TestCase):
+    def setUp(self):
+        category = Category.objects.create(name='أجهزة', slug='devices')
+        self.product = Product.objects.create(category=category, name='a', slug='a', description='', price=Decimal('10.00'))
+        self.cart = Cart.objects.create(session_key='k')
+
+    def test_add_locks_cart_before_reading_quantities(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.cart.add_quantities({self.product.pk: 1})
+        statements = [query['sql'] for query in queries if not query['sql'].startswith(('SAVEPOINT', 'RELEASE'))]
+        self.assertTrue(statements[0].startswith('UPDATE "orders_cart"'), statements)
+        self.cart.add_quantities({self.product.pk: 2})
+        self.assertEqual(CartItem.objects.get(cart=self.cart).quantity, 3)
+
+
+class PlaceOrderTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        category = Category.objects.create(name='أجهزة', slug='devices')
+        cls.products = [
+            Product.objects.create(
+                category=category, name=f'جهاز {index}', slug=f'p{index}', description='', price=Decimal('10.00'),
+            )
+            for index in range(20)
+        ]
+        cls.user = CustomUser.objects.create_user('01000000002', full_name='مستخدم')
+
+    def setUp(self):
+        # فهرس العروض ورقم العامل يُحمّلان مرة لكل عملية، لا مع كل طلب
+        self.enterContext(mock.patch('offers.pricing._index', None))
+        get_index()
+        Order.generate_order_number()
+
+    def cart_with(self, products, quantity=1):
+        cart = Cart.objects.create(user=self.user)
+        cart.add_quantities({product.pk: quantity for product in products})
+        return cart
+
+    def place(self, cart):
+        return place_order(self.user, cart, 'مستخدم', '01000000002', address='القاهرة')
+
+    def test_query_count_does_not_grow_with_cart(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.place(self.cart_with(self.products[:1]))
+        Cart.objects.all().delete()
+        with self.assertNumQueries(len(queries)):
+            order = self.place(self.cart_with(self.products))
+        self.assertEqual(order.items.count(), 20)
+
+    def test_total_and_link_from_snapshot(self):
+        cart = self.cart_with(self.products[:2], quantity=2)
+        order = self.place(cart)
+        Product.objects.update(price=Decimal('99.00'))
+        order.refresh_from_db()
+        self.assertEqual(order.total_amount, Decimal('40.00'))
+        self.assertEqual([item.price for item in order.items.all()], [Decimal('10.00')] * 2)
+        message = unquote(order.whatsapp_link.split('?text=', 1)[1])
+        self.assertIn(order.order_number, message)
+        self.assertIn('• جهاز 0 x 2 = 20.00 جنيه', message)
+        self.assertIn('المبلغ الإجمالي: 40.00 جنيه', message)
+
+    def test_cart_is_cleared(self):
+        cart = self.cart_with(self.products[:3])
+        self.place(cart)
+        self.assertTrue(cart.is_empty())
+        self.assertFalse(CartItem.objects.exists())
+
+    @override_settings(CART_STORE='orders.cart_store.CacheCartStore', CART_STORE_FLUSH_INTERVAL=3600)
+    def test_cache_store_cart(self):
+        cache.clear()
+        cart = self.cart_with(self.products[:2], quantity=2)
+        # البنود في الكاش فقط حتى الكتابة المؤجلة
+        self.assertFalse(CartItem.objects.exists())
+        order = self.place(cart)
+        self.assertEqual(order.total_amount, Decimal('40.00'))
+        self.assertTrue(cart.is_empty())
+        self.assertFalse(CartItem.objects.exists())
+
+    def test_empty_cart_is_rejected(self):
+        cart = Cart.objects.create(user=self.user)
+        with self.assertRaises(EmptyCartError):
+            self.place(cart)
+        self.assertFalse(Order.objects.exists())
+
+
+class OrderListAPITests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user('01000000003', full_name='مستخدم')
+        other = CustomUser.objects.create_user('01000000004', full_name='آخر')
+        start = timezone.now() - timedelta(days=10)
+        cls.orders = [
+            Order.objects.create(
+                user=cls.user, full_name='مستخدم', phone='1', address='-',
+                status='completed' if index % 2 else 'pending', created_at=start + timedelta(days=index),
+            )
+            for index in range(5)
+        ]
+        Order.objects.create(user=other, full_name='آخر', phone='2', address='-')
+        OrderItem.objects.create(order=cls.orders[0], product_name='جهاز', quantity=1, price=Decimal('5.00'))
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def get(self, **params):
+        return self.client.get(reverse('orders:api_order_list'), params)
+
+    def numbers(self, response):
+        return [order['order_number'] for order in response.json()['orders']]
+
+    def test_cursor_pages_cover_all_orders_newest_first(self):
+        first = self.get(page_size=3).json()
+        self.assertIsNone(first['previous'])
+        second = self.client.get(first['next']).json()
+        self.assertIsNone(second['next'])
+        numbers = [order['order_number'] for order in first['orders'] + second['orders']]
+        self.assertEqual(numbers, [order.order_number for order in reversed(self.orders)])
+
+    def test_filters(self):
+        self.assertEqual(
+            self.numbers(self.get(status='completed')),
+            [self.orders[3].order_number, self.orders[1].order_number],
+        )
+        day = timezone.localdate(self.orders[2].created_at)
+        self.assertEqual(
+            self.numbers(self.get(created_after=day.isoformat(), created_before=day.isoformat())),
+            [self.orders[2].order_number],
+        )
+
+    def test_invalid_filter_is_rejected(self):
+        for params in ({'status': 'shipped'}, {'created_after': 'yesterday'}):
+            response = self.get(**params)
+            self.assertEqual(response.status_code, 400)
+            self.assertFalse(response.json()['success'])
+
+    def test_fields_without_items_skip_prefetch(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.get(fields='order_number,status')
+        self.assertFalse(any('orders_orderitem' in query['sql'] for query in queries))
+        self.assertEqual(set(response.json()['orders'][0]), {'order_number', 'status'})
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.get(fields='order_number,items')
+        self.assertEqual(sum('orders_orderitem' in query['sql'] for query in queries), 1)
+        self.assertEqual(response.json()['orders'][-1]['items'][0]['product_name'], 'جهاز')
+
+
+class MergeSessionCartTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        category = Category.objects.create(name='أجهزة', slug='devices')
+        cls.first = Product.objects.create(category=category, name='a', slug='a', description='', price=Decimal('10.00'))
+        cls.second = Product.objects.create(category=category, name='b', slug='b', description='', price=Decimal('10.00'))
+        cls.user = CustomUser.objects.create_user('01000000005', full_name='مستخدم')
+
+    def guest_cart(self, quantities):
+        session = self.client.session
+        cart = Cart.objects.create(session_key=get_cart_key(session, create=True))
+        session.save()
+        cart.add_quantities(quantities)
+        return cart
+
+    def test_guest_cart_becomes_user_cart(self):
+        guest_cart = self.guest_cart({self.first.pk: 2})
+        self.client.force_login(self.user)
+        guest_cart.refresh_from_db()
+        self.assertEqual(guest_cart.user, self.user)
+        self.assertIsNone(guest_cart.session_key)
+        self.assertEqual(guest_cart.get_lines(), {self.first.pk: 2})
+        self.assertNotIn(CART_SESSION_KEY, self.client.session)
+
+    def test_guest_cart_merged_into_user_cart(self):
+        user_cart = Cart.objects.create(user=self.user)
+        user_cart.add_quantities({self.first.pk: 1})
+        self.guest_cart({self.first.pk: 2, self.second.pk: 1})
+        self.client.force_login(self.user)
+        self.assertEqual(Cart.objects.get().pk, user_cart.pk)
+        self.assertEqual(user_cart.get_lines(), {self.first.pk: 3, self.second.pk: 1})
+
+
+class PurgeAbandonedCartsTests(TestCase):
+    def setUp(self):
+        category = Category.objects.create(name='أجهزة', slug='devices')
+        self.product = Product.objects.create(category=category, name='a', slug='a', description='', price=Decimal('10.00'))
+        self.long_ago = timezone.now() - timedelta(days=60)
+
+    def old_cart(self, **kwargs):
+        cart = Cart.objects.create(**kwargs)
+        cart.add_quantities({self.product.pk: 1})
+        CartItem.objects.filter(cart=cart).update(created_at=self.long_ago)
+        Cart.objects.filter(pk=cart.pk).update(updated_at=self.long_ago)
+        return cart
+
+    def test_recently_updated_cart_is_kept(self):
+        idle = self.old_cart(session_key='idle')
+        active = self.old_cart(session_key='active')
+        item = active.get_items()[0]
+        active.set_item_quantity(item.id, 3)
+        user_cart = self.old_cart(user=CustomUser.objects.create_user('01000000001', full_name='مستخدم'))
+
+        deleted = purge_abandoned_carts(timezone.now() - timedelta(days=30))
+
+        self.assertEqual(deleted, 1)
+        self.assertFalse(Cart.objects.filter(pk=idle.pk).exists())
+        self.assertTrue(Cart.objects.filter(pk=active.pk).exists())
+        self.assertTrue(Cart.objects.filter(pk=user_cart.pk).exists())
+
+    @override_settings(CART_STORE='orders.cart_store.CacheCartStore')
+    def test_cart_with_live_cache_entry_is_kept(self):
+        cache.clear()
+        idle = self.old_cart(session_key='idle')
+        cached = self.old_cart(session_key='cached')
+        cache.clear()
+        # تعديل في الكاش من عملية أخرى لم يُكتب بعد في قاعدة البيانات
+        store = get_store()
+        cache.set(store.key(cached.pk), {self.product.pk: 4})
+
+        deleted = purge_abandoned_carts(timezone.now() - timedelta(days=30))
+
+        self.assertEqual(deleted, 1)
+        self.assertFalse(Cart.objects.filter(pk=idle.pk).exists())
+        self.assertTrue(Cart.objects.filter(pk=cached.pk).exists())
+
+    @override_settings(CART_STORE='orders.cart_store.CacheCartStore', CART_STORE_FLUSH_INTERVAL=3600)
+    def test_exit_flush_skips_another_database(self):
+        cache.clear()
+        cart = Cart.objects.create(session_key='k')
+        cart.add_quantities({self.product.pk: 2})
+        # بعد الاختبارات يعود الاتصال إلى قاعدة البيانات الحقيقية
+        with mock.patch.dict(connection.settings_dict, NAME='db.sqlite3'):
+            self.assertEqual(cart_store.flush(), 0)
+        self.assertFalse(CartItem.objects.exists())
+        self.assertEqual(cart_store.flush(), 1)
+        self.assertEqual(CartItem.objects.get().quantity, 2)
@@ -1,30 +1,21 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.http import JsonResponse
+from django.http import Http404, JsonResponse
 from django.views.decorators.http import require_POST
-from .models import Cart, CartItem, Order, OrderItem
+from .models import Order
+from .services import EmptyCartError, get_cart, place_order
 from products.models import Product
 import json
 from django.views.decorators.csrf import csrf_exempt
 from django.contrib.auth import get_user_model
 from django.http import JsonResponse, HttpResponseForbidden
 from offers.models import Offer, OfferProduct 
+from offers.pricing import attach_effective_prices
+from offers.services import apply_offer_to_cart
 import json
 
 
-def get_or_create_cart(request):
-    if request.user.is_authenticated:
-        cart, created = Cart.objects.get_or_create(user=request.user)
-    else:
-        session_key = request.session.session_key
-        if not session_key:
-            request.session.create()
-            session_key = request.session.session_key
-        cart, created = Cart.objects.get_or_create(session_key=session_key)
-    return cart
-
-
 @require_POST
 def add_to_cart(request):
     try:
@@ -33,23 +24,15 @@ def add_to_cart(request):
         quantity = int(data.get('quantity', 1))
 
         product = get_object_or_404(Product, id=product_id, is_active=True)
-        cart = get_or_create_cart(request)
-
-        cart_item, created = CartItem.objects.get_or_create(
-            cart=cart,
-            product=product,
-            defaults={'quantity': quantity}
-        )
-
-        if not created:
-            cart_item.quantity += quantity
-            cart_item.save()
+        cart = get_cart(request, create=True)
+        cart.add_quantities({product.id: quantity})
 
+        summary = cart.summary()
         return JsonResponse({
             'success': True,
             'message': 'تم إضافة المنتج للسلة',
-            'cart_count': cart.total_items,
-            'cart_total': float(cart.total_price)
+            'cart_count': summary['total_items'],
+            'cart_total': float(summary['total_price'])
         })
     except Exception as e:
         return JsonResponse({'success': False, 'message': str(e)}, status=400)
@@ -61,14 +44,15 @@ def remove_from_cart(request):
         data = json.loads(request.body)
         item_id = data.get('item_id')
 
-        cart = get_or_create_cart(request)
-        CartItem.objects.filter(id=item_id, cart=cart).delete()
+        cart = get_cart(request)
+        cart.remove_item(item_id)
 
+        summary = cart.summary()
         return JsonResponse({
             'success': True,
             'message': 'تم حذف المنتج',
-            'cart_count': cart.total_items,
-            'cart_total': float(cart.total_price)
+            'cart_count': summary['total_items'],
+            'cart_total': float(summary['total_price'])
         })
     except Exception as e:
         return JsonResponse({'success': False, 'message': str(e)}, status=400)
@@ -81,19 +65,16 @@ def update_cart_quantity(request):
         item_id = data.get('item_id')
         quantity = int(data.get('quantity'))
 
-        cart = get_or_create_cart(request)
-        cart_item = get_object_or_404(CartItem, id=item_id, cart=cart)
-
-        if quantity > 0:
-            cart_item.quantity = quantity
-            cart_item.save()
-        else:
-            cart_item.delete()
+        cart = get_cart(request)
+        cart_item = cart.set_item_quantity(item_id, quantity)
+        if cart_item is None:
+            raise Http404('العنصر غير موجود في السلة')
 
+        summary = cart.summary()
         return JsonResponse({
             'success': True,
             'item_subtotal': float(cart_item.subtotal) if quantity > 0 else 0,
-            'cart_total': float(cart.total_price)
+            'cart_total': float(summary['total_price'])
         })
     except Exception as e:
         return JsonResponse({'success': False, 'message': str(e)}, status=400)
@@ -102,8 +83,8 @@ def update_cart_quantity(request):
 @require_POST
 def clear_cart(request):
     try:
-        cart = get_or_create_cart(request)
-        cart.items.all().delete()
+        cart = get_cart(request)
+        cart.clear()
         return JsonResponse({
             'success': True,
             'message': 'تم تفريغ السلة بنجاح',
@@ -115,46 +96,37 @@ def clear_cart(request):
 
 
 def cart_view(request):
-    cart = get_or_create_cart(request)
+    cart = get_cart(request)
     context = {'cart': cart}
     return render(request, 'orders/cart.html', context)
 
 
 @login_required
 def checkout(request):
-    cart = get_or_create_cart(request)
+    cart = get_cart(request)
 
-    if not cart.items.exists():
+    if cart.is_empty():
         messages.warning(request, 'السلة فارغة')
         return redirect('products:list')
 
     if request.method == 'POST':
-        order = Order.objects.create(
-            user=request.user,
-            full_name=request.POST.get('full_name', request.user.full_name),
-            phone=request.POST.get('phone', request.user.phone),
-            email=request.POST.get('email', request.user.email or ''),
-            address=request.POST.get('address', ''),
-            notes=request.POST.get('notes', ''),
-            total_amount=cart.total_price
-        )
-
-        for cart_item in cart.items.all():
-            OrderItem.objects.create(
-                order=order,
-                product=cart_item.product,
-                product_name=cart_item.product.name,
-                quantity=cart_item.quantity,
-                price=cart_item.product.final_price
+        try:
+            order = place_order(
+                request.user,
+                cart,
+                full_name=request.POST.get('full_name', request.user.full_name),
+                phone=request.POST.get('phone', request.user.phone),
+                email=request.POST.get('email', request.user.email or ''),
+                address=request.POST.get('address', ''),
+                notes=request.POST.get('notes', ''),
             )
-
-        whatsapp_link = order.generate_whatsapp_link()
-
-        cart.items.all().delete()
+        except EmptyCartError:
+            messages.warning(request, 'السلة فارغة')
+            return redirect('products:list')
 
         messages.success(request, 'تم إنشاء الطلب بنجاح')
 
-        return redirect(whatsapp_link)
+        return redirect(order.whatsapp_link)
 
     context = {'cart': cart}
     return render(request, 'orders/checkout.html', context)
@@ -180,55 +152,49 @@ def order_detail(request, order_number):
 def add_all_offer_products(request, offer_id):
     if request.method == "POST":
         data = json.loads(request.body)
-        products_data = data.get("products", [])
-        cart, created = Cart.objects.get_or_create(user=request.user)
-
-        added_products = []
-
-        for p in products_data:
-            product = Product.objects.get(id=p["id"])
-            cart_item, created = CartItem.objects.get_or_create(
-                cart=cart,
-                product=product,
-                defaults={'quantity': 1}
-            )
-            if not created:
-                cart_item.quantity += 1
-                cart_item.save()
-
-            added_products.append({
+        product_ids = [p["id"] for p in data.get("products", [])]
+        offer = get_object_or_404(Offer, id=offer_id)
+        cart = get_cart(request, create=True)
+
+        products, summary = apply_offer_to_cart(cart, offer, product_ids)
+        attach_effective_prices(products)
+        added_products = [
+            {
                 "id": product.id,
                 "name": product.name,
-                "price": product.final_price
-            })
+                "price": product.effective_price
+            }
+            for product in products
+        ]
 
         return JsonResponse({
             "status": "success",
-            "cart_count": cart.items.count(),
+            "cart_count": summary['total_items'],
             "products": added_products
         })
         
 def cart_api(request):
     """Return cart JSON (items, totals). GET only."""
-    cart = get_or_create_cart(request)
+    cart = get_cart(request)
     items = []
-    for ci in cart.items.all():
+    for ci in cart.get_items():
         items.append({
             'cart_item_id': ci.id,
             'product_id': ci.product.id,
             'name': ci.product.name,
             'quantity': ci.quantity,
-            'price': float(ci.product.final_price),
+            'price': float(ci.product.effective_price),
             'subtotal': float(ci.subtotal),
             'is_active': ci.product.is_active,
             'slug': getattr(ci.product, 'slug', ''),
         })
 
+    summary = cart.summary()
     return JsonResponse({
         'success': True,
         'items': items,
-        'cart_count': cart.total_items,
-        'cart_total': float(cart.total_price)
+        'cart_count': summary['total_items'],
+        'cart_total': float(summary['total_price'])
     })
 
 
@@ -240,39 +206,26 @@ def api_create_order(request):
     Returns JSON with success and whatsapp_link + order_number.
     """
     try:
-        cart = get_or_create_cart(request)
-        if not cart.items.exists():
-            return JsonResponse({'success': False, 'message': 'السلة فارغة'}, status=400)
+        cart = get_cart(request)
 
-        # Create order
-        order = Order.objects.create(
-            user=request.user,
+        # Create order, its items, whatsapp link and clear cart in one transaction
+        order = place_order(
+            request.user,
+            cart,
             full_name=request.POST.get('full_name', request.user.full_name),
             phone=request.POST.get('phone', request.user.phone),
             email=request.POST.get('email', request.user.email or ''),
             address=request.POST.get('address', ''),
             notes=request.POST.get('notes', ''),
-            total_amount=cart.total_price
         )
 
-        for cart_item in cart.items.all():
-            OrderItem.objects.create(
-                order=order,
-                product=cart_item.product,
-                product_name=cart_item.product.name,
-                quantity=cart_item.quantity,
-                price=cart_item.product.final_price
-            )
-
-        # Generate whatsapp link and clear cart
-        whatsapp_link = order.generate_whatsapp_link()
-        cart.items.all().delete()
-
         return JsonResponse({
             'success': True,
             'message': 'تم إنشاء الطلب بنجاح',
-            'whatsapp_link': whatsapp_link,
+            'whatsapp_link': order.whatsapp_link,
             'order_number': order.order_number
         })
+    except EmptyCartError:
+        return JsonResponse({'success': False, 'message': 'السلة فارغة'}, status=400)
     except Exception as e:
         return JsonResponse({'success': False, 'message': str(e)}, status=500)
\ No newline at end of file
@@ -37,7 +37,7 @@ class ProductAdmin(admin.ModelAdmin):
     list_filter = ('category', 'brand', 'is_featured', 'is_active', 'created_at')
     search_fields = ('name', 'description')
     prepopulated_fields = {'slug': ('name',)}
-    readonly_fields = ('views', 'created_at', 'updated_at')
+    readonly_fields = ('views', 'rating_sum', 'rating_count', 'created_at', 'updated_at')
     inlines = [ProductImageInline, ProductFeatureInline]
     
     fieldsets = (
@@ -54,7 +54,7 @@ class ProductAdmin(admin.ModelAdmin):
             'fields': ('is_featured', 'is_active')
         }),
         ('الإحصائيات', {
-            'fields': ('views', 'created_at', 'updated_at'),
+            'fields': ('views', 'rating_sum', 'rating_count', 'created_at', 'updated_at'),
             'classes': ('collapse',)
         }),
     )
@@ -0,0 +1,55 @@
+"""
+Cache for catalog navigation data (featured products, active categories).
+
+Keys embed a catalog version number; any save/delete of a Category, Product
+or Offer bumps the version (see products.signals / offers.signals), so stale
+entries are simply never read again and expire on their own.
+
+With the default per-process locmem cache, other worker processes only see
+a change once their entries time out (CATALOG_CACHE_TIMEOUT); point the
+``CACHES['default']`` setting at a shared backend (file, Redis) to make
+invalidation immediate everywhere.
+"""
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import Category, Product
+
+VERSION_KEY = 'catalog:version'
+
+
+def get_version():
+    return cache.get_or_set(VERSION_KEY, 1, timeout=None)
+
+
+def bump_version():
+    try:
+        return cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.set(VERSION_KEY, 1, timeout=None)
+        return 1
+
+
+def cached(name, build):
+    """Return the cached value of ``name`` for the current catalog version, building it on a miss."""
+    key = f'catalog:{get_version()}:{name}'
+    value = cache.get(key)
+    if value is None:
+        value = build()
+        cache.set(key, value, timeout=getattr(settings, 'CATALOG_CACHE_TIMEOUT', 300))
+    return value
+
+
+def featured_products(limit=4):
+    return cached(f'featured:{limit}', lambda: list(
+        Product.objects.filter(is_active=True, is_featured=True).select_related('category', 'brand')[:limit]
+    ))
+
+
+def active_categories(limit=None):
+    def build():
+        categories = Category.objects.filter(is_active=True)
+        if limit is not None:
+            categories = categories[:limit]
+        return list(categories)
+    return cached(f'categories:{limit}', build)
@@ -0,0 +1,36 @@
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+from .models import Product, ProductImage
+
+# ترتيب اختيار الصورة الرئيسية: المعلمة is_primary أولاً ثم حسب الترتيب
+PRIMARY_ORDERING = ('-is_primary', 'order', 'id')
+
+
+def refresh_image_summary(product_ids=None):
+    """
+    Recompute Product.primary_image / image_count from the ProductImage table.
+
+    Like refresh_rating_aggregates this is a single UPDATE with correlated
+    subqueries, used after an image write and by the migration backfill.
+    """
+    images = ProductImage.objects.filter(product=OuterRef('pk'))
+    primary = images.order_by(*PRIMARY_ORDERING).values('pk')[:1]
+    image_count = images.order_by().values('product').annotate(total=Count('id')).values('total')
+
+    products = Product.objects.all()
+    if product_ids is not None:
+        products = products.filter(pk__in=product_ids)
+
+    return products.update(
+        primary_image=Subquery(primary),
+        image_count=Coalesce(Subquery(image_count, output_field=IntegerField()), Value(0)),
+    )
+
+
+def enforce_single_primary(image):
+    """عند تعليم صورة كرئيسية تُلغى العلامة من باقي صور نفس المنتج"""
+    if image.is_primary:
+        ProductImage.objects.filter(product_id=image.product_id, is_primary=True).exclude(pk=image.pk).update(
+            is_primary=False
+        )
@@ -0,0 +1,116 @@
+"""
+Responsive image renditions.
+
+Uploaded product images and brand logos are resized with Pillow to the widths
+in ``IMAGE_RENDITION_WIDTHS`` and saved next to the original as WebP and JPEG
+(``products/x.jpg`` → ``products/x_320w.webp`` / ``products/x_320w.jpg``).
+The generated widths are recorded on the model together with the source file
+name, so templates can build ``srcset`` without touching storage; renditions
+recorded for a different (replaced) file are ignored.  New uploads are
+processed by signals, existing files by ``manage.py build_image_renditions``.
+"""
+import posixpath
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps
+
+FORMATS = {
+    # امتداد الملف: (صيغة Pillow, إعدادات الحفظ)
+    'webp': ('WEBP', {'quality': 80, 'method': 4}),
+    'jpg': ('JPEG', {'quality': 82, 'optimize': True, 'progressive': True}),
+}
+
+# نوع MIME لكل امتداد لاستخدامه في <source type="...">
+MIME_TYPES = {'webp': 'image/webp', 'jpg': 'image/jpeg'}
+
+# الحقول التي تُولد لها نسخ مصغرة: {model label: field name}
+IMAGE_FIELDS = {
+    'products.ProductImage': 'image',
+    'products.Brand': 'logo',
+}
+
+
+def rendition_widths():
+    return tuple(getattr(settings, 'IMAGE_RENDITION_WIDTHS', (320, 640, 1024)))
+
+
+def rendition_name(name, width, extension):
+    stem, _ = posixpath.splitext(name)
+    return f'{stem}_{width}w.{extension}'
+
+
+def renditions_field(field_name):
+    return f'{field_name}_renditions'
+
+
+def generate_renditions(name, storage=None):
+    """
+    Write every rendition of the stored file ``name`` narrower than the
+    original and return ``{'name': name, 'widths': [...]}`` for the model.
+    Safe to run in a worker process: it only touches storage, not the database.
+    """
+    storage = storage or default_storage
+    with storage.open(name, 'rb') as source:
+        image = ImageOps.exif_transpose(Image.open(source))
+        image.load()
+
+    if image.mode not in ('RGB', 'RGBA'):
+        image = image.convert('RGBA' if 'transparency' in image.info or image.mode in ('LA', 'PA') else 'RGB')
+    if image.mode == 'RGBA':
+        # JPEG لا يدعم الشفافية: خلفية بيضاء مثل خلفية بطاقات المنتجات
+        flat = Image.new('RGB', image.size, 'white')
+        flat.paste(image, mask=image.getchannel('A'))
+    else:
+        flat = image
+
+    widths = [width for width in rendition_widths() if width < image.width]
+    for width in widths:
+        height = round(image.height * width / image.width)
+        for extension, (fmt, options) in FORMATS.items():
+            source_image = image if fmt == 'WEBP' else flat
+            resized = source_image.resize((width, height), Image.LANCZOS)
+            target = rendition_name(name, width, extension)
+            content = ContentFile(b'')
+            resized.save(content, fmt, **options)
+            if storage.exists(target):
+                storage.delete(target)
+            storage.save(target, content)
+    return {'name': name, 'widths': widths}
+
+
+def current_widths(instance, field_name):
+    """Widths recorded for the file currently in ``field_name`` (empty if stale or missing)."""
+    file = getattr(instance, field_name)
+    data = getattr(instance, renditions_field(field_name)) or {}
+    if not file or data.get('name') != file.name:
+        return []
+    return data.get('widths', [])
+
+
+def needs_renditions(instance, field_name):
+    file = getattr(instance, field_name)
+    data = getattr(instance, renditions_field(field_name)) or {}
+    return bool(file) and data.get('name') != file.name
+
+
+def update_renditions(instance, field_name):
+    """Generate renditions for ``instance`` and store the result without re-saving the row."""
+    data = generate_renditions(getattr(instance, field_name).name)
+    type(instance).objects.filter(pk=instance.pk).update(**{renditions_field(field_name): data})
+    setattr(instance, renditions_field(field_name), data)
+    return data
+
+
+def srcsets(instance, field_name):
+    """{extension: 'url 320w, url 640w, ...'} للنسخ المتاحة، أو {} إذا لم تُولد بعد"""
+    widths = current_widths(instance, field_name)
+    if not widths:
+        return {}
+    name = getattr(instance, field_name).name
+    storage = getattr(instance, field_name).storage
+    return {
+        extension: ', '.join(f'{storage.url(rendition_name(name, width, extension))} {width}w' for width in widths)
+        for extension in FORMATS
+    }
@@ -0,0 +1,55 @@
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import django
+from django.apps import apps
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from products.catalog_cache import bump_version
+from products.images import IMAGE_FIELDS, generate_renditions, needs_renditions, renditions_field
+
+
+def build(label, pk, name):
+    # يعمل في عملية منفصلة: يقرأ ويكتب الملفات فقط ويُرجع النتيجة لتحفظها العملية الرئيسية
+    return label, pk, generate_renditions(name)
+
+
+class Command(BaseCommand):
+    help = 'Generate WebP/JPEG renditions for existing product images and brand logos using a process pool'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+        parser.add_argument('--force', action='store_true', help='Regenerate renditions that already exist')
+
+    def handle(self, *args, **options):
+        jobs = []
+        for label, field_name in IMAGE_FIELDS.items():
+            model = apps.get_model(label)
+            for instance in model.objects.exclude(**{field_name: ''}).exclude(**{f'{field_name}__isnull': True}):
+                if options['force'] or needs_renditions(instance, field_name):
+                    jobs.append((label, instance.pk, getattr(instance, field_name).name))
+
+        if not jobs:
+            self.stdout.write('All images already have renditions')
+            return
+
+        # لا تُورث اتصالات قاعدة البيانات للعمليات الفرعية
+        connections.close_all()
+        done = failed = 0
+        with ProcessPoolExecutor(max_workers=options['workers'], initializer=django.setup) as pool:
+            futures = [pool.submit(build, *job) for job in jobs]
+            for future in as_completed(futures):
+                try:
+                    label, pk, data = future.result()
+                except Exception as exc:
+                    failed += 1
+                    self.stderr.write(f'Failed: {exc}')
+                    continue
+                model = apps.get_model(label)
+                model.objects.filter(pk=pk).update(**{renditions_field(IMAGE_FIELDS[label]): data})
+                done += 1
+
+        if done:
+            bump_version()
+        self.stdout.write(self.style.SUCCESS(f'Built renditions for {done} images ({failed} failed)'))
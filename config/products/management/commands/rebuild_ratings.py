@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from products.ratings import refresh_rating_aggregates
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the denormalized rating_sum / rating_count columns on Product'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--product', type=int, action='append', dest='product_ids',
+            help='Only rebuild the given product id (can be repeated)',
+        )
+
+    def handle(self, *args, **options):
+        updated = refresh_rating_aggregates(options['product_ids'])
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt ratings for {updated} products'))
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:06
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def backfill_ratings(apps, schema_editor):
+    Product = apps.get_model('products', 'Product')
+    Review = apps.get_model('products', 'Review')
+    totals = Review.objects.values('product').annotate(rating_sum=Sum('rating'), rating_count=Count('id'))
+    for row in totals:
+        Product.objects.filter(pk=row['product']).update(
+            rating_sum=row['rating_sum'],
+            rating_count=row['rating_count'],
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='rating_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='عدد التقييمات'),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='rating_sum',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='مجموع التقييمات'),
+        ),
+        migrations.RunPython(backfill_ratings, migrations.RunPython.noop),
+    ]
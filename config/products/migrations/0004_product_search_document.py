@@ -0,0 +1,86 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:08
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+from products.search.normalize import normalize_arabic
+
+SQLITE_SETUP = [
+    "CREATE VIRTUAL TABLE products_search_fts USING fts5(name, body, tokenize='unicode61 remove_diacritics 2')",
+    """CREATE TRIGGER products_search_fts_ai AFTER INSERT ON products_productsearchdocument BEGIN
+        INSERT INTO products_search_fts(rowid, name, body) VALUES (new.product_id, new.name, new.body);
+    END""",
+    """CREATE TRIGGER products_search_fts_ad AFTER DELETE ON products_productsearchdocument BEGIN
+        DELETE FROM products_search_fts WHERE rowid = old.product_id;
+    END""",
+    """CREATE TRIGGER products_search_fts_au AFTER UPDATE ON products_productsearchdocument BEGIN
+        DELETE FROM products_search_fts WHERE rowid = old.product_id;
+        INSERT INTO products_search_fts(rowid, name, body) VALUES (new.product_id, new.name, new.body);
+    END""",
+]
+
+SQLITE_TEARDOWN = [
+    'DROP TRIGGER IF EXISTS products_search_fts_ai',
+    'DROP TRIGGER IF EXISTS products_search_fts_ad',
+    'DROP TRIGGER IF EXISTS products_search_fts_au',
+    'DROP TABLE IF EXISTS products_search_fts',
+]
+
+POSTGRES_SETUP = [
+    """CREATE INDEX products_search_document_gin ON products_productsearchdocument USING gin (
+        (setweight(to_tsvector('simple', name), 'A') || setweight(to_tsvector('simple', body), 'B'))
+    )""",
+]
+
+POSTGRES_TEARDOWN = [
+    'DROP INDEX IF EXISTS products_search_document_gin',
+]
+
+
+def run_for_vendor(statements):
+    def run(apps, schema_editor):
+        for statement in statements.get(schema_editor.connection.vendor, []):
+            schema_editor.execute(statement)
+    return run
+
+
+def populate_documents(apps, schema_editor):
+    Product = apps.get_model('products', 'Product')
+    ProductSearchDocument = apps.get_model('products', 'ProductSearchDocument')
+    documents = []
+    for product in Product.objects.prefetch_related('features'):
+        body = [product.description, product.specifications]
+        body.extend(feature.feature for feature in product.features.all())
+        documents.append(ProductSearchDocument(
+            product=product,
+            name=normalize_arabic(product.name),
+            body=normalize_arabic('\n'.join(filter(None, body))),
+        ))
+    ProductSearchDocument.objects.bulk_create(documents, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0003_product_rating_aggregates'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProductSearchDocument',
+            fields=[
+                ('product', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='search_document', serialize=False, to='products.product')),
+                ('name', models.TextField(blank=True)),
+                ('body', models.TextField(blank=True)),
+            ],
+            options={
+                'verbose_name': 'فهرس بحث منتج',
+                'verbose_name_plural': 'فهرس بحث المنتجات',
+            },
+        ),
+        migrations.RunPython(
+            run_for_vendor({'sqlite': SQLITE_SETUP, 'postgresql': POSTGRES_SETUP}),
+            run_for_vendor({'sqlite': SQLITE_TEARDOWN, 'postgresql': POSTGRES_TEARDOWN}),
+        ),
+        migrations.RunPython(populate_documents, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:40
+
+from django.db import migrations
+
+# الفهرس السابق كان على تعبير لا يطابق ما يولده SearchVector (COALESCE و ::regconfig)، فلم يُستخدم أبدًا.
+# العمود المخزن يُحسب عند الكتابة ويستعلم عنه PostgresSearchBackend مباشرة.
+POSTGRES_SETUP = [
+    'DROP INDEX IF EXISTS products_search_document_gin',
+    """ALTER TABLE products_productsearchdocument ADD COLUMN search_vector tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('simple', name), 'A') || setweight(to_tsvector('simple', body), 'B')
+    ) STORED""",
+    'CREATE INDEX products_search_vector_gin ON products_productsearchdocument USING gin (search_vector)',
+]
+
+POSTGRES_TEARDOWN = [
+    'DROP INDEX IF EXISTS products_search_vector_gin',
+    'ALTER TABLE products_productsearchdocument DROP COLUMN IF EXISTS search_vector',
+    """CREATE INDEX products_search_document_gin ON products_productsearchdocument USING gin (
+        (setweight(to_tsvector('simple', name), 'A') || setweight(to_tsvector('simple', body), 'B'))
+    )""",
+]
+
+
+def run_on_postgres(statements):
+    def run(apps, schema_editor):
+        if schema_editor.connection.vendor == 'postgresql':
+            for statement in statements:
+                schema_editor.execute(statement)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0007_product_primary_image'),
+    ]
+
+    operations = [
+        migrations.RunPython(run_on_postgres(POSTGRES_SETUP), run_on_postgres(POSTGRES_TEARDOWN)),
+    ]
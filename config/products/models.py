@@ -42,6 +42,8 @@ class SubCategory(models.Model):
 class Brand(models.Model):
     name = models.CharField(max_length=200, verbose_name='اسم الشركة المصنعة')
     logo = models.ImageField(upload_to='brands/', blank=True, null=True)
+    # النسخ المصغرة المولدة للشعار: {'name': اسم الملف الأصلي, 'widths': [...]}
+    logo_renditions = models.JSONField(default=dict, blank=True, editable=False)
     description = models.TextField(blank=True, verbose_name='الوصف')
     
     class Meta:
@@ -74,6 +76,14 @@ class Product(models.Model):
     is_active = models.BooleanField(default=True, verbose_name='نشط')
     
     views = models.IntegerField(default=0, verbose_name='عدد المشاهدات')
+    rating_sum = models.PositiveIntegerField(default=0, editable=False, verbose_name='مجموع التقييمات')
+    rating_count = models.PositiveIntegerField(default=0, editable=False, verbose_name='عدد التقييمات')
+    # الصورة الرئيسية وعدد الصور، تُحدث من إشارات ProductImage (انظر gallery.py)
+    primary_image = models.ForeignKey(
+        'ProductImage', on_delete=models.SET_NULL, null=True, blank=True, editable=False,
+        related_name='+', verbose_name='الصورة الرئيسية',
+    )
+    image_count = models.PositiveIntegerField(default=0, editable=False, verbose_name='عدد الصور')
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
@@ -81,6 +91,28 @@ class Product(models.Model):
         verbose_name = 'منتج'
         verbose_name_plural = 'المنتجات'
         ordering = ['-created_at']
+        indexes = [
+            # فهارس جزئية على الحقول المنطقية: Django يكتب is_active=True كشرط منطقي مجرد
+            # لا يستطيع SQLite استخدامه مع فهرس مركب يبدأ بـ is_active
+            # الصفحة الرئيسية: المنتجات المميزة النشطة الأحدث أولاً
+            models.Index(
+                fields=['-created_at'],
+                name='product_featured_idx',
+                condition=models.Q(is_active=True, is_featured=True),
+            ),
+            # صفحة الفئة: منتجات الفئة النشطة مرتبة بمؤشر الصفحات (created_at, id)
+            models.Index(
+                fields=['category', '-created_at', '-id'],
+                name='product_category_recent_idx',
+                condition=models.Q(is_active=True),
+            ),
+            # قائمة المنتجات: كل المنتجات النشطة مرتبة بمؤشر الصفحات
+            models.Index(
+                fields=['-created_at', '-id'],
+                name='product_active_recent_idx',
+                condition=models.Q(is_active=True),
+            ),
+        ]
     
     def __str__(self):
         return self.name
@@ -97,20 +129,29 @@ class Product(models.Model):
             return self.price - discount_amount
         return self.price
     
+    @property
+    def effective_price(self):
+        """السعر بعد خصم المنتج وأفضل عرض ساري عليه (أو المحسوب مسبقًا بـ attach_effective_prices)"""
+        if '_effective_price' in self.__dict__:
+            return self._effective_price
+        from offers.pricing import effective_price
+        return effective_price(self)
+    
     @property
     def average_rating(self):
-        reviews = self.reviews.all()
-        if reviews:
-            return sum(r.rating for r in reviews) / len(reviews)
+        if self.rating_count:
+            return self.rating_sum / self.rating_count
         return 0
     
     @property
     def total_reviews(self):
-        return self.reviews.count()
+        return self.rating_count
 
 class ProductImage(models.Model):
     product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='images')
     image = models.ImageField(upload_to='products/', verbose_name='الصورة')
+    # النسخ المصغرة المولدة للصورة: {'name': اسم الملف الأصلي, 'widths': [...]}
+    image_renditions = models.JSONField(default=dict, blank=True, editable=False)
     is_primary = models.BooleanField(default=False, verbose_name='صورة رئيسية')
     order = models.IntegerField(default=0, verbose_name='الترتيب')
     
@@ -152,4 +193,17 @@ class Review(models.Model):
         ordering = ['-created_at']
     
     def __str__(self):
-        return f"{self.user.full_name} - {self.product.name} ({self.rating}/5)"
\ No newline at end of file
+        return f"{self.user.full_name} - {self.product.name} ({self.rating}/5)"
+
+class ProductSearchDocument(models.Model):
+    """Arabic-normalized copy of a product's searchable text, maintained by products.search."""
+    product = models.OneToOneField(Product, on_delete=models.CASCADE, primary_key=True, related_name='search_document')
+    name = models.TextField(blank=True)
+    body = models.TextField(blank=True)
+
+    class Meta:
+        verbose_name = 'فهرس بحث منتج'
+        verbose_name_plural = 'فهرس بحث المنتجات'
+
+    def __str__(self):
+        return self.name
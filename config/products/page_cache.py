@@ -0,0 +1,131 @@
+"""
+Full-page cache for anonymous catalog pages.
+
+``cache_anonymous_page`` stores the rendered HTML of a GET request under a
+key built from the catalog version (see catalog_cache), the language and the
+full URL including the query string.  Logged-in users and visitors with items
+in their cart always get a fresh render.  A view can set
+``response.page_cache_expires`` (an aware datetime, e.g. an offer's end date)
+to keep the page from being served past that moment.  Hit/miss/bypass counters are kept in
+the cache and exposed to staff by ``stats_view``.
+"""
+import hashlib
+import math
+from functools import wraps
+
+from django.conf import settings
+from django.contrib.admin.views.decorators import staff_member_required
+from django.contrib.messages import get_messages
+from django.core.cache import cache
+from django.http import HttpResponse, JsonResponse
+from django.utils import timezone
+from django.utils.translation import get_language
+
+from .catalog_cache import get_version
+
+STATS = ('hits', 'misses', 'bypasses')
+
+
+def record(stat):
+    key = f'page_cache:{stat}'
+    cache.add(key, 0, timeout=None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        pass
+
+
+def get_stats():
+    values = cache.get_many([f'page_cache:{stat}' for stat in STATS])
+    return {stat: values.get(f'page_cache:{stat}', 0) for stat in STATS}
+
+
+def has_cart_items(request):
+    if not request.session.session_key:
+        return False
+    # عبر مخزن السلة: مع CacheCartStore قد تكون البنود في الكاش فقط
+    from orders.services import get_cart
+    return not get_cart(request).is_empty()
+
+
+def is_cacheable_request(request):
+    if request.method not in ('GET', 'HEAD'):
+        return False
+    if request.user.is_authenticated:
+        return False
+    if len(get_messages(request)):
+        return False
+    return not has_cart_items(request)
+
+
+def is_cacheable_response(response):
+    return (
+        response.status_code == 200
+        and not response.streaming
+        and not response.cookies
+        and b'csrfmiddlewaretoken' not in response.content
+    )
+
+
+def page_timeout(response):
+    """مدة التخزين: PAGE_CACHE_TIMEOUT بحد أقصى الوقت المتبقي حتى page_cache_expires (0 = لا تُخزن)"""
+    timeout = getattr(settings, 'PAGE_CACHE_TIMEOUT', 600)
+    expires = getattr(response, 'page_cache_expires', None)
+    if expires is not None:
+        remaining = (expires - timezone.now()).total_seconds()
+        timeout = min(timeout, max(math.floor(remaining), 0))
+    return timeout
+
+
+def page_key(request):
+    # يراجع حدود العروض أولاً: بدء أو انتهاء عرض يرفع إصدار الكتالوج ويُبطل الصفحات
+    from offers.pricing import get_index
+    get_index()
+    path = hashlib.md5(request.get_full_path().encode()).hexdigest()
+    return f'page:{get_version()}:{get_language()}:{path}'
+
+
+def cache_anonymous_page(view=None, on_hit=None):
+    """
+    Cache ``view`` for anonymous visitors.  A view may attach a
+    ``page_cache_meta`` dict to its response; it is stored with the page and
+    passed to ``on_hit(request, meta)`` whenever the cached copy is served.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapped(request, *args, **kwargs):
+            if not is_cacheable_request(request):
+                record('bypasses')
+                return view(request, *args, **kwargs)
+
+            key = page_key(request)
+            entry = cache.get(key)
+            if entry is not None:
+                record('hits')
+                if on_hit:
+                    on_hit(request, entry['meta'])
+                response = HttpResponse(entry['content'], content_type=entry['content_type'])
+                response['X-Page-Cache'] = 'HIT'
+                return response
+
+            record('misses')
+            response = view(request, *args, **kwargs)
+            timeout = page_timeout(response)
+            if timeout and is_cacheable_response(response):
+                cache.set(key, {
+                    'content': response.content,
+                    'content_type': response['Content-Type'],
+                    'meta': getattr(response, 'page_cache_meta', {}),
+                }, timeout=timeout)
+                response['X-Page-Cache'] = 'MISS'
+            return response
+        return wrapped
+
+    if view is not None:
+        return decorator(view)
+    return decorator
+
+
+@staff_member_required
+def stats_view(request):
+    return JsonResponse(get_stats())
@@ -0,0 +1,124 @@
+"""
+Keyset (cursor) pagination for the catalog listings.
+
+Pages are addressed by ``?after=<cursor>`` / ``?before=<cursor>`` where the
+cursor encodes the ``(created_at, id)`` of the boundary product, so every
+page costs one indexed range query regardless of how deep the visitor goes.
+"""
+import base64
+from datetime import datetime
+
+from django.conf import settings
+from django.core.paginator import Paginator
+from django.db.models import Q
+
+
+def get_page_size(request):
+    default = getattr(settings, 'PRODUCTS_PAGE_SIZE', 12)
+    maximum = getattr(settings, 'PRODUCTS_MAX_PAGE_SIZE', 48)
+    try:
+        size = int(request.GET.get('page_size', default))
+    except (TypeError, ValueError):
+        size = default
+    return max(1, min(size, maximum))
+
+
+def encode_cursor(product):
+    raw = f'{product.created_at.isoformat()}|{product.pk}'
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(value):
+    """Return ``(created_at, id)`` or None for a missing/tampered cursor."""
+    if not value:
+        return None
+    try:
+        padded = value + '=' * (-len(value) % 4)
+        created_at, pk = base64.urlsafe_b64decode(padded).decode().split('|')
+        return datetime.fromisoformat(created_at), int(pk)
+    except (ValueError, UnicodeDecodeError):
+        return None
+
+
+class CatalogPage:
+    """A page of products plus the query strings of its neighbouring pages."""
+
+    def __init__(self, object_list, request, next_params=None, previous_params=None):
+        self.object_list = object_list
+        self.next_querystring = self._querystring(request, next_params)
+        self.previous_querystring = self._querystring(request, previous_params)
+
+    @staticmethod
+    def _querystring(request, params):
+        if params is None:
+            return None
+        query = request.GET.copy()
+        for key in ('after', 'before', 'page'):
+            query.pop(key, None)
+        query.update(params)
+        return query.urlencode()
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __bool__(self):
+        return bool(self.object_list)
+
+    @property
+    def has_next(self):
+        return self.next_querystring is not None
+
+    @property
+    def has_previous(self):
+        return self.previous_querystring is not None
+
+    @property
+    def has_other_pages(self):
+        return self.has_next or self.has_previous
+
+
+def paginate_keyset(queryset, request, page_size=None):
+    """Return a CatalogPage of ``queryset`` ordered newest first by ``(created_at, id)``."""
+    page_size = page_size or get_page_size(request)
+    after = decode_cursor(request.GET.get('after'))
+    before = None if after else decode_cursor(request.GET.get('before'))
+
+    if before:
+        created_at, pk = before
+        rows = list(
+            queryset.filter(Q(created_at__gt=created_at) | Q(created_at=created_at, pk__gt=pk))
+            .order_by('created_at', 'id')[:page_size + 1]
+        )
+        has_previous = len(rows) > page_size
+        rows = rows[:page_size][::-1]
+        has_next = bool(rows)
+    else:
+        if after:
+            created_at, pk = after
+            queryset = queryset.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, pk__lt=pk))
+        rows = list(queryset.order_by('-created_at', '-id')[:page_size + 1])
+        has_next = len(rows) > page_size
+        rows = rows[:page_size]
+        has_previous = bool(rows) and after is not None
+
+    return CatalogPage(
+        rows, request,
+        next_params={'after': encode_cursor(rows[-1])} if has_next else None,
+        previous_params={'before': encode_cursor(rows[0])} if has_previous else None,
+    )
+
+
+def paginate_ranked(queryset, request, page_size=None):
+    """
+    Page through an already-ordered queryset (e.g. search results ordered by
+    rank), where a (created_at, id) cursor does not apply.
+    """
+    page = Paginator(queryset, page_size or get_page_size(request)).get_page(request.GET.get('page'))
+    return CatalogPage(
+        list(page), request,
+        next_params={'page': page.next_page_number()} if page.has_next() else None,
+        previous_params={'page': page.previous_page_number()} if page.has_previous() else None,
+    )
@@ -0,0 +1,25 @@
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+from .models import Product, Review
+
+
+def refresh_rating_aggregates(product_ids=None):
+    """
+    Recompute rating_sum / rating_count from the Review table.
+
+    Runs as a single UPDATE with correlated subqueries, so it is safe to call
+    for one product after a review write or for the whole catalog at once.
+    """
+    reviews = Review.objects.filter(product=OuterRef('pk')).order_by().values('product')
+    rating_sum = reviews.annotate(total=Sum('rating')).values('total')
+    rating_count = reviews.annotate(total=Count('id')).values('total')
+
+    products = Product.objects.all()
+    if product_ids is not None:
+        products = products.filter(pk__in=product_ids)
+
+    return products.update(
+        rating_sum=Coalesce(Subquery(rating_sum, output_field=IntegerField()), Value(0)),
+        rating_count=Coalesce(Subquery(rating_count, output_field=IntegerField()), Value(0)),
+    )
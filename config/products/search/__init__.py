@@ -0,0 +1,75 @@
+"""
+Product full-text search.
+
+Each product has a ProductSearchDocument holding its Arabic-normalized name
+and body (description, specifications and features).  Documents are kept in
+sync by signals and rebuilt with ``manage.py rebuild_search_index``; the
+database-specific index over them is chosen by ``get_backend``.
+"""
+from django.conf import settings
+from django.db import connection
+from django.utils.module_loading import import_string
+
+from ..models import Product, ProductSearchDocument
+from .backends import PostgresSearchBackend, SimpleSearchBackend, SQLiteFTSBackend
+from .normalize import normalize_arabic, tokenize
+
+VENDOR_BACKENDS = {
+    'sqlite': SQLiteFTSBackend,
+    'postgresql': PostgresSearchBackend,
+}
+
+
+def get_backend():
+    backend_path = getattr(settings, 'PRODUCT_SEARCH_BACKEND', None)
+    if backend_path:
+        return import_string(backend_path)()
+    return VENDOR_BACKENDS.get(connection.vendor, SimpleSearchBackend)()
+
+
+def search_products(queryset, query):
+    """Filter ``queryset`` to products matching ``query``, best matches first."""
+    return get_backend().search(queryset, query)
+
+
+def build_document(product):
+    body = [product.description, product.specifications]
+    body.extend(feature.feature for feature in product.features.all())
+    return ProductSearchDocument(
+        product=product,
+        name=normalize_arabic(product.name),
+        body=normalize_arabic('\n'.join(filter(None, body))),
+    )
+
+
+def index_products(product_ids):
+    """(Re)index the given products; ids that no longer exist are dropped from the index."""
+    product_ids = set(product_ids)
+    products = Product.objects.filter(pk__in=product_ids).prefetch_related('features')
+    documents = [build_document(product) for product in products]
+    ProductSearchDocument.objects.bulk_create(
+        documents,
+        update_conflicts=True,
+        unique_fields=['product'],
+        update_fields=['name', 'body'],
+    )
+    missing = product_ids - {document.product_id for document in documents}
+    if missing:
+        ProductSearchDocument.objects.filter(pk__in=missing).delete()
+    return len(documents)
+
+
+def rebuild_index(batch_size=500):
+    """Reindex every product in batches and re-sync the backend; returns the number indexed."""
+    product_ids = list(Product.objects.order_by('pk').values_list('pk', flat=True))
+    indexed = 0
+    for start in range(0, len(product_ids), batch_size):
+        indexed += index_products(product_ids[start:start + batch_size])
+    get_backend().rebuild()
+    return indexed
+
+
+__all__ = [
+    'get_backend', 'search_products', 'index_products', 'rebuild_index',
+    'normalize_arabic', 'tokenize',
+]
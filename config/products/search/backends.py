@@ -0,0 +1,113 @@
+from django.db import connection
+from django.db.models import FloatField, Q, Value
+from django.db.models.expressions import RawSQL
+
+from ..models import Product, ProductSearchDocument
+from .normalize import tokenize
+
+FTS_TABLE = 'products_search_fts'
+
+
+class BaseSearchBackend:
+    """
+    Searches Product through ProductSearchDocument.
+
+    ``search`` returns the queryset filtered to matches, annotated with
+    ``search_rank`` (higher is better) and ordered by it.
+    """
+
+    def search(self, queryset, query):
+        raise NotImplementedError
+
+    def rebuild(self):
+        """Re-sync any backend-specific structures after a bulk document rebuild."""
+
+
+class SimpleSearchBackend(BaseSearchBackend):
+    """Token AND-match over the normalized columns, for databases without an FTS engine."""
+
+    def search(self, queryset, query):
+        tokens = tokenize(query)
+        if not tokens:
+            return queryset.none()
+        for token in tokens:
+            queryset = queryset.filter(
+                Q(search_document__name__contains=token) |
+                Q(search_document__body__contains=token)
+            )
+        return queryset.annotate(search_rank=Value(0.0, output_field=FloatField())).order_by('-created_at')
+
+
+class SQLiteFTSBackend(BaseSearchBackend):
+    """
+    SQLite FTS5 index (``products_search_fts``) kept in step with
+    ProductSearchDocument by triggers created in the migration.
+    Ranked with bm25, weighting the product name over the body.
+    """
+    name_weight = 10.0
+    body_weight = 1.0
+
+    def match_expression(self, query):
+        # كل كلمة تُطابق كبادئة حتى يعمل البحث أثناء الكتابة
+        return ' '.join('"%s"*' % token.replace('"', '""') for token in tokenize(query))
+
+    def search(self, queryset, query):
+        match = self.match_expression(query)
+        if not match:
+            return queryset.none()
+
+        product_table = Product._meta.db_table
+        matches = RawSQL(f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s', (match,))
+        rank = RawSQL(
+            f'SELECT -bm25({FTS_TABLE}, %s, %s) FROM {FTS_TABLE} '
+            f'WHERE {FTS_TABLE} MATCH %s AND {FTS_TABLE}.rowid = {product_table}.id',
+            (self.name_weight, self.body_weight, match),
+            output_field=FloatField(),
+        )
+        return (
+            queryset.filter(pk__in=matches)
+            .annotate(search_rank=rank)
+            .order_by('-search_rank', '-created_at')
+        )
+
+    def rebuild(self):
+        document_table = ProductSearchDocument._meta.db_table
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {FTS_TABLE}')
+            cursor.execute(
+                f'INSERT INTO {FTS_TABLE}(rowid, name, body) '
+                f'SELECT product_id, name, body FROM {document_table}'
+            )
+
+
+class PostgresSearchBackend(BaseSearchBackend):
+    """
+    Weighted tsvector search (name 'A', body 'B') with prefix matching over
+    the stored ``search_vector`` column of ProductSearchDocument, a generated
+    column with a GIN index created in the migrations.
+    """
+
+    def search(self, queryset, query):
+        tokens = tokenize(query)
+        if not tokens:
+            return queryset.none()
+
+        # الرموز من \w+ فقط، فلا تحتوي على عوامل to_tsquery
+        tsquery = ' & '.join(f'{token}:*' for token in tokens)
+        product_table = Product._meta.db_table
+        document_table = ProductSearchDocument._meta.db_table
+        matches = RawSQL(
+            f"SELECT product_id FROM {document_table} WHERE search_vector @@ to_tsquery('simple', %s)",
+            (tsquery,),
+        )
+        rank = RawSQL(
+            f"SELECT ts_rank(search_vector, to_tsquery('simple', %s)) FROM {document_table} "
+            f'WHERE {document_table}.product_id = {product_table}.id',
+            (tsquery,),
+            output_field=FloatField(),
+        )
+        return (
+            queryset.filter(pk__in=matches)
+            .annotate(search_rank=rank)
+            .order_by('-search_rank', '-created_at')
+        )
@@ -0,0 +1,33 @@
+import re
+
+# حركات التشكيل وعلامات المصحف والألف الخنجرية
+_DIACRITICS = re.compile('[\u0610-\u061a\u064b-\u065f\u0670\u06d6-\u06ed]')
+_TATWEEL = '\u0640'
+
+_CHAR_MAP = str.maketrans({
+    'أ': 'ا',
+    'إ': 'ا',
+    'آ': 'ا',
+    'ٱ': 'ا',
+    'ة': 'ه',
+    'ى': 'ي',
+    'ؤ': 'و',
+    'ئ': 'ي',
+})
+
+_TOKEN = re.compile(r'\w+', re.UNICODE)
+
+
+def normalize_arabic(text):
+    """
+    Fold Arabic spelling variants so that indexed text and queries compare equal:
+    strips diacritics and tatweel, unifies alef forms, taa marbuta and alef maqsura.
+    """
+    if not text:
+        return ''
+    text = _DIACRITICS.sub('', text).replace(_TATWEEL, '')
+    return text.translate(_CHAR_MAP).lower()
+
+
+def tokenize(text):
+    return _TOKEN.findall(normalize_arabic(text))
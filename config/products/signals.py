@@ -0,0 +1,75 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .catalog_cache import bump_version
+from .gallery import enforce_single_primary, refresh_image_summary
+from .images import IMAGE_FIELDS, needs_renditions, update_renditions
+from .models import Brand, Category, Product, ProductFeature, ProductImage, Review
+from .ratings import refresh_rating_aggregates
+from .search import index_products
+
+
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Review)
+def update_product_rating(sender, instance, **kwargs):
+    """Keep Product.rating_sum / rating_count in step with its reviews."""
+    refresh_rating_aggregates([instance.product_id])
+
+
+@receiver(post_save, sender=ProductImage)
+def update_primary_image(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    enforce_single_primary(instance)
+    refresh_image_summary([instance.product_id])
+
+
+@receiver(post_delete, sender=ProductImage)
+def forget_product_image(sender, instance, **kwargs):
+    refresh_image_summary([instance.product_id])
+
+
+def schedule_reindex(product_id):
+    # بعد انتهاء المعاملة حتى تكون المميزات المضافة من الـ inline محفوظة
+    transaction.on_commit(lambda: index_products([product_id]))
+
+
+@receiver(post_save, sender=Product)
+def reindex_product(sender, instance, raw=False, **kwargs):
+    if not raw:
+        schedule_reindex(instance.pk)
+
+
+@receiver(post_save, sender=ProductFeature)
+@receiver(post_delete, sender=ProductFeature)
+def reindex_product_feature(sender, instance, raw=False, **kwargs):
+    if not raw:
+        schedule_reindex(instance.product_id)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+@receiver(post_save, sender=ProductImage)
+@receiver(post_delete, sender=ProductImage)
+@receiver(post_save, sender=ProductFeature)
+@receiver(post_delete, sender=ProductFeature)
+def invalidate_catalog_cache(sender, **kwargs):
+    bump_version()
+
+
+@receiver(post_save, sender=ProductImage)
+@receiver(post_save, sender=Brand)
+def build_renditions(sender, instance, raw=False, **kwargs):
+    field_name = IMAGE_FIELDS[sender._meta.label]
+    if raw or not needs_renditions(instance, field_name):
+        return
+
+    def build():
+        update_renditions(instance, field_name)
+        # الصفحات المخزنة تُعاد بناؤها بـ srcset الجديد
+        bump_version()
+
+    transaction.on_commit(build)
@@ -0,0 +1,28 @@
+from django import template
+from django.utils.html import format_html, format_html_join
+
+from ..images import MIME_TYPES, srcsets
+
+register = template.Library()
+
+
+@register.simple_tag
+def picture(instance, field_name='image', alt='', sizes='(max-width: 768px) 50vw, 300px', css_class=''):
+    """
+    <picture> بنسخ WebP/JPEG بعرض مناسب للشاشة، مع الصورة الأصلية كاحتياطي
+    قبل توليد النسخ. الاستخدام: {% picture primary_img 'image' alt=product.name %}
+    """
+    file = getattr(instance, field_name, None)
+    if not file:
+        return ''
+    available = srcsets(instance, field_name)
+    if not available:
+        return format_html('<img src="{}" alt="{}" class="{}" loading="lazy">', file.url, alt, css_class)
+    sources = format_html_join(
+        '', '<source type="{}" srcset="{}" sizes="{}">',
+        ((MIME_TYPES[extension], srcset, sizes) for extension, srcset in available.items() if extension != 'jpg'),
+    )
+    return format_html(
+        '<picture class="responsive-image">{}<img src="{}" srcset="{}" sizes="{}" alt="{}" class="{}" loading="lazy"></picture>',
+        sources, file.url, available['jpg'], sizes, alt, css_class,
+    )
@@ -1,3 +1,336 @@
-from django.test import TestCase
+import io
+import re
+import shutil
+import tempfile
+from decimal import Decimal
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import DatabaseError, connection
+from django.template import Context, Template
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from PIL import Image
+
+from users.models import CustomUser
+
+from . import view_counter
+from .images import rendition_name, srcsets
+from .models import Category, Product, ProductFeature, ProductImage, ProductSearchDocument, Review
+from .search import normalize_arabic, search_products
+from .search.backends import PostgresSearchBackend, SimpleSearchBackend
+
+
+@skipUnless(connection.vendor == 'sqlite', 'EXPLAIN QUERY PLAN output is SQLite specific')
+class QueryPlanTestCase(TestCase):
+    """Asserts that hot queries are served by an index instead of a full table scan."""
+
+    def assertUsesIndex(self, queryset, *index_names):
+        plan = queryset.explain()
+        self.assertTrue(any(name in plan for name in index_names), plan)
+        table = queryset.model._meta.db_table
+        self.assertIsNone(re.search(rf'SCAN {table}\s*$', plan, re.MULTILINE), plan)
+
+
+class ProductIndexTests(QueryPlanTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.category = Category.objects.create(name='أجهزة', slug='devices')
+
+    def test_featured_products(self):
+        self.assertUsesIndex(
+            Product.objects.filter(is_active=True, is_featured=True).order_by('-created_at')[:4],
+            # على جدول صغير قد يفضّل المخطِّط فهرس الترتيب العام، وكلاهما يغني عن المسح والفرز
+            'product_featured_idx',
+            'product_active_recent_idx',
+        )
+
+    def test_category_listing(self):
+        self.assertUsesIndex(
+            Product.objects.filter(category=self.category, is_active=True).order_by('-created_at', '-id')[:12],
+            'product_category_recent_idx',
+        )
+
+    def test_active_listing(self):
+        self.assertUsesIndex(
+            Product.objects.filter(is_active=True).order_by('-created_at', '-id')[:12],
+            'product_active_recent_idx',
+        )
+
+
+class RatingAggregateTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        category = Category.objects.create(name='أجهزة', slug='devices')
+        cls.product = Product.objects.create(category=category, name='a', slug='a', description='', price=Decimal('10.00'))
+        cls.other = Product.objects.create(category=category, name='b', slug='b', description='', price=Decimal('10.00'))
+        cls.users = [
+            CustomUser.objects.create_user(f'0100000001{index}', full_name=f'مستخدم {index}') for index in range(2)
+        ]
+
+    def assertRating(self, product, rating_sum, rating_count):
+        product.refresh_from_db()
+        self.assertEqual((product.rating_sum, product.rating_count), (rating_sum, rating_count))
+
+    def review(self, user, rating):
+        # نفس طريقة حفظ التقييم في add_review
+        review, _ = Review.objects.update_or_create(
+            product=self.product, user=user, defaults={'rating': rating, 'comment': '-'},
+        )
+        return review
+
+    def test_create_update_delete(self):
+        self.review(self.users[0], 4)
+        self.assertRating(self.product, 4, 1)
+        self.review(self.users[1], 2)
+        self.assertRating(self.product, 6, 2)
+        self.assertEqual(self.product.average_rating, 3)
+
+        review = self.review(self.users[0], 5)
+        self.assertRating(self.product, 7, 2)
+
+        review.delete()
+        self.assertRating(self.product, 2, 1)
+        self.assertRating(self.other, 0, 0)
+
+    def test_rebuild_fixes_drifted_counters(self):
+        self.review(self.users[0], 4)
+        Product.objects.update(rating_sum=99, rating_count=7)
+        call_command('rebuild_ratings', stdout=io.StringIO())
+        self.assertRating(self.product, 4, 1)
+        self.assertRating(self.other, 0, 0)
+
+
+class ArabicNormalizationTests(TestCase):
+    def test_folds_spelling_variants(self):
+        self.assertEqual(normalize_arabic('أَجْهِزَةٌ طـبية'), normalize_arabic('اجهزه طبيه'))
+        self.assertEqual(normalize_arabic('مستشفى'), 'مستشفي')
+        self.assertEqual(normalize_arabic('ECG'), 'ecg')
+
+
+class ProductSearchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.category = Category.objects.create(name='أجهزة', slug='devices')
+
+    def create_product(self, name, description='', features=()):
+        # الفهرسة تتم بعد انتهاء المعاملة
+        with self.captureOnCommitCallbacks(execute=True):
+            product = Product.objects.create(
+                category=self.category, name=name, slug=f'p-{Product.objects.count()}',
+                description=description, price=Decimal('100.00'),
+            )
+            for feature in features:
+                ProductFeature.objects.create(product=product, feature=feature)
+        return product
+
+    def search(self, query):
+        return list(search_products(Product.objects.all(), query))
+
+    def test_matches_normalized_arabic(self):
+        product = self.create_product('جهاز قياس الضغط', 'شاشة رقمية')
+        self.assertEqual(self.search('جِهاز الضّغط'), [product])
+        self.assertEqual(self.search('جهاز حراره'), [])
+
+    def test_prefix_match(self):
+        product = self.create_product('سماعة طبية')
+        self.assertEqual(self.search('سماع'), [product])
+
+    def test_name_ranks_above_body(self):
+        in_body = self.create_product('جهاز تنفس', 'يستخدم مع الأكسجين')
+        in_name = self.create_product('مكثف الأكسجين')
+        self.assertEqual(self.search('الاكسجين'), [in_name, in_body])
+
+    def test_features_are_indexed(self):
+        product = self.create_product('جهاز', features=['بطارية قابلة للشحن'])
+        self.assertEqual(self.search('بطاريه'), [product])
+
+    def test_deleted_product_leaves_index(self):
+        product = self.create_product('ميزان حرارة')
+        with self.captureOnCommitCallbacks(execute=True):
+            product.delete()
+        self.assertFalse(ProductSearchDocument.objects.exists())
+        self.assertEqual(self.search('ميزان'), [])
+
+    def test_simple_backend_matches_tokens(self):
+        product = self.create_product('جهاز قياس الضغط')
+        self.create_product('جهاز قياس السكر')
+        results = SimpleSearchBackend().search(Product.objects.all(), 'قياس الضغط')
+        self.assertEqual(list(results), [product])
+
+    def test_postgres_backend_queries_indexed_vector(self):
+        # يجب أن يطابق الاستعلام العمود المفهرس بـ GIN، لا أن يبني tsvector لكل صف
+        sql = str(PostgresSearchBackend().search(Product.objects.all(), 'جهاز الضغط').query)
+        self.assertIn("search_vector @@ to_tsquery('simple', جهاز:* & الضغط:*)", sql)
+        self.assertNotIn('to_tsvector', sql)
+
+
+def image_upload(name='photo.png', size=(800, 600), mode='RGBA'):
+    buffer = io.BytesIO()
+    Image.new(mode, size, (200, 30, 30, 128) if mode == 'RGBA' else (200, 30, 30)).save(buffer, 'PNG')
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type='image/png')
+
+
+class MediaTestCase(TestCase):
+    """يكتب الملفات المرفوعة في مجلد مؤقت يُحذف بعد الاختبارات."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.media_root = tempfile.mkdtemp()
+        cls.enterClassContext(override_settings(MEDIA_ROOT=cls.media_root, IMAGE_RENDITION_WIDTHS=(320, 640, 1024)))
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(cls.media_root, ignore_errors=True)
+
+    def setUp(self):
+        self.category = Category.objects.create(name='أجهزة', slug='devices')
+        self.product = Product.objects.create(
+            category=self.category, name='جهاز', slug='device', description='', price=Decimal('10.00'),
+        )
+
+    def add_image(self, **kwargs):
+        with self.captureOnCommitCallbacks(execute=True):
+            return ProductImage.objects.create(product=self.product, image=image_upload(), **kwargs)
+
+
+class ImageRenditionTests(MediaTestCase):
+    def test_renditions_generated_on_upload(self):
+        image = self.add_image()
+        image.refresh_from_db()
+        # النسخ الأعرض من الأصل (800px) لا تُولد
+        self.assertEqual(image.image_renditions, {'name': image.image.name, 'widths': [320, 640]})
+        for width in (320, 640):
+            for extension in ('webp', 'jpg'):
+                name = rendition_name(image.image.name, width, extension)
+                self.assertTrue(default_storage.exists(name), name)
+                with default_storage.open(name) as rendition:
+                    self.assertEqual(Image.open(rendition).width, width)
+
+    def test_stale_renditions_are_ignored(self):
+        image = self.add_image()
+        image.refresh_from_db()
+        self.assertIn('webp', srcsets(image, 'image'))
+        image.image_renditions = {'name': 'products/other.png', 'widths': [320]}
+        self.assertEqual(srcsets(image, 'image'), {})
+
+    def test_picture_tag(self):
+        image = self.add_image()
+        image.refresh_from_db()
+        html = Template("{% load product_images %}{% picture image 'image' alt='جهاز' %}").render(Context({'image': image}))
+        self.assertIn('<picture class="responsive-image"><source type="image/webp"', html)
+        self.assertIn('_320w.webp 320w', html)
+        self.assertIn('_640w.jpg 640w', html)
+
+
+class PrimaryImageTests(MediaTestCase):
+    def assertSummary(self, primary, count):
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.primary_image, primary)
+        self.assertEqual(self.product.image_count, count)
+
+    def test_first_image_becomes_primary(self):
+        self.assertSummary(None, 0)
+        first = self.add_image(order=1)
+        self.assertSummary(first, 1)
+        self.add_image(order=2)
+        self.assertSummary(first, 2)
+
+    def test_flagged_image_wins_and_is_unique(self):
+        first = self.add_image(is_primary=True)
+        second = self.add_image(is_primary=True)
+        self.assertSummary(second, 2)
+        first.refresh_from_db()
+        self.assertFalse(first.is_primary)
+
+    def test_delete_moves_primary(self):
+        first = self.add_image(order=1)
+        second = self.add_image(order=2)
+        first.delete()
+        self.assertSummary(second, 1)
+        second.delete()
+        self.assertSummary(None, 0)
+
+
+@override_settings(PRODUCT_VIEWS_FLUSH_INTERVAL=3600)
+class ViewCounterTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        category = Category.objects.create(name='أجهزة', slug='devices')
+        cls.first = Product.objects.create(category=category, name='a', slug='a', description='', price=Decimal('10.00'))
+        cls.second = Product.objects.create(category=category, name='b', slug='b', description='', price=Decimal('10.00'))
+
+    def setUp(self):
+        view_counter._pending.clear()
+        self.addCleanup(view_counter._pending.clear)
+
+    def assertViews(self, product, views):
+        product.refresh_from_db()
+        self.assertEqual(product.views, views)
+
+    def test_flush_batches_increments(self):
+        for product in (self.first, self.first, self.second):
+            view_counter.record(product.pk)
+        self.assertViews(self.first, 0)
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(view_counter.flush(), 2)
+        # UPDATE واحد لكل زيادة مختلفة
+        self.assertEqual(sum(query['sql'].startswith('UPDATE') for query in queries), 2)
+        self.assertViews(self.first, 2)
+        self.assertViews(self.second, 1)
+        self.assertEqual(view_counter.flush(), 0)
+
+    def test_failed_flush_is_requeued_once(self):
+        view_counter.record(self.first.pk)
+        view_counter.record(self.second.pk)
+        with mock.patch('django.db.models.query.QuerySet.update', side_effect=DatabaseError), \
+                self.assertLogs('products.view_counter', 'ERROR'):
+            self.assertEqual(view_counter.flush(), 0)
+        self.assertViews(self.first, 0)
+        self.assertEqual(view_counter.flush(), 2)
+        self.assertViews(self.first, 1)
+        self.assertViews(self.second, 1)
+
+    def test_exit_flush_skips_another_database(self):
+        view_counter.record(self.first.pk)
+        # بعد الاختبارات يعود الاتصال إلى قاعدة البيانات الحقيقية
+        with mock.patch.dict(connection.settings_dict, NAME='db.sqlite3'):
+            view_counter.flush_at_exit()
+        self.assertViews(self.first, 0)
+        view_counter.flush_at_exit()
+        self.assertViews(self.first, 1)
+
+    def test_cached_page_hit_counts_view(self):
+        cache.clear()
+        url = reverse('products:detail', args=[self.first.slug])
+        self.assertEqual(self.client.get(url)['X-Page-Cache'], 'MISS')
+        self.assertEqual(self.client.get(url)['X-Page-Cache'], 'HIT')
+        view_counter.flush()
+        self.assertViews(self.first, 2)
+
+
+@override_settings(CART_STORE='orders.cart_store.CacheCartStore', CART_STORE_FLUSH_INTERVAL=3600)
+class PageCacheCartTests(TestCase):
+    def test_guest_with_cached_cart_items_bypasses_page_cache(self):
+        from orders.models import Cart
+        from orders.services import get_cart_key
+
+        cache.clear()
+        category = Category.objects.create(name='أجهزة', slug='devices')
+        product = Product.objects.create(category=category, name='a', slug='a', description='', price=Decimal('10.00'))
+        self.assertEqual(self.client.get('/')['X-Page-Cache'], 'MISS')
+
+        session = self.client.session
+        cart = Cart.objects.create(session_key=get_cart_key(session, create=True))
+        session.save()
+        cart.add_quantities({product.pk: 1})
+        self.assertFalse(cart.items.exists())
+
+        response = self.client.get('/')
+        self.assertFalse(response.has_header('X-Page-Cache'))
@@ -0,0 +1,79 @@
+"""
+Buffered product view counter.
+
+product_detail used to write ``views += 1`` on every hit.  Increments are now
+accumulated per process and flushed in bulk with ``F('views') + n`` once
+``PRODUCT_VIEWS_FLUSH_INTERVAL`` seconds have passed, and again at shutdown.
+The shutdown flush only writes to the database the views were counted
+against: after a test run the connection points back at the real database.
+"""
+import atexit
+import logging
+import threading
+import time
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.db import DatabaseError, connection, transaction
+from django.db.models import F
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_pending = Counter()
+_last_flush = time.monotonic()
+_database = None
+
+
+def flush_interval():
+    return getattr(settings, 'PRODUCT_VIEWS_FLUSH_INTERVAL', 30)
+
+
+def record(product_id):
+    """Count one view of ``product_id``, flushing if the interval has elapsed."""
+    global _database
+    with _lock:
+        _pending[product_id] += 1
+        _database = connection.settings_dict['NAME']
+        due = time.monotonic() - _last_flush >= flush_interval()
+    if due:
+        flush()
+
+
+def flush():
+    """Write all buffered increments; returns the number of products updated."""
+    global _last_flush
+    with _lock:
+        if not _pending:
+            _last_flush = time.monotonic()
+            return 0
+        pending = dict(_pending)
+        _pending.clear()
+        _last_flush = time.monotonic()
+
+    # One UPDATE per distinct increment instead of one per product.
+    by_increment = defaultdict(list)
+    for product_id, count in pending.items():
+        by_increment[count].append(product_id)
+
+    from .models import Product
+
+    try:
+        # كل التحديثات في معاملة واحدة: إما تُكتب كلها أو لا شيء، فإعادة الجدولة لا تحسب أي مشاهدة مرتين
+        with transaction.atomic():
+            for count, product_ids in by_increment.items():
+                Product.objects.filter(pk__in=product_ids).update(views=F('views') + count)
+    except DatabaseError:
+        logger.exception('Failed to flush product views, re-queueing')
+        with _lock:
+            _pending.update(pending)
+        return 0
+    return len(pending)
+
+
+def flush_at_exit():
+    if _database == connection.settings_dict['NAME']:
+        flush()
+
+
+atexit.register(flush_at_exit)
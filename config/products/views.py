@@ -1,28 +1,39 @@
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib import messages
-from django.db.models import Q
-from .models import Category, Product, Review
-from django.core.paginator import Paginator
+from offers.pricing import attach_effective_prices
+from .gallery import PRIMARY_ORDERING
+from .models import Category, Product, ProductImage, Review
+from . import catalog_cache, view_counter
+from .page_cache import cache_anonymous_page
+from .pagination import paginate_keyset, paginate_ranked
+from .search import search_products
 
+
+def catalog_queryset():
+    """Active products with everything a listing card needs, in a single query."""
+    return Product.objects.filter(is_active=True).select_related('category', 'brand', 'primary_image')
+
+@cache_anonymous_page
 def home(request):
-    featured_products = Product.objects.filter(is_active=True, is_featured=True)[:4]
-    categories = Category.objects.filter(is_active=True)[:6]
+    featured_products = catalog_cache.featured_products(4)
+    categories = catalog_cache.active_categories(6)
     return render(request, 'index.html', {
         'featured_products': featured_products,
         'categories': categories
     })
     
     
+@cache_anonymous_page
 def products_list(request):
-    categories = Category.objects.filter(is_active=True)
-    products = Product.objects.filter(is_active=True)
+    categories = catalog_cache.active_categories()
+    products = catalog_queryset()
     
     search_query = request.GET.get('search', '')
     if search_query:
-        products = products.filter(
-            Q(name__icontains=search_query) | 
-            Q(description__icontains=search_query)
-        )
+        products = paginate_ranked(search_products(products, search_query), request)
+    else:
+        products = paginate_keyset(products, request)
+    attach_effective_prices(products)
     
     context = {
         'categories': categories,
@@ -31,11 +42,15 @@ def products_list(request):
     }
     return render(request, 'products/products.html', context)
 
+def record_cached_view(request, meta):
+    view_counter.record(meta['product_id'])
+
+
+@cache_anonymous_page(on_hit=record_cached_view)
 def product_detail(request, slug):
-    product = get_object_or_404(Product, slug=slug, is_active=True)
+    product = get_object_or_404(Product.objects.select_related('primary_image'), slug=slug, is_active=True)
     
-    product.views += 1
-    product.save(update_fields=['views'])
+    view_counter.record(product.id)
     
     related_products = Product.objects.filter(
         category=product.category,
@@ -44,14 +59,23 @@ def product_detail(request, slug):
     
     context = {
         'product': product,
+        # الصورة الرئيسية أولاً، باستعلام واحد فقط وعند وجود صور
+        'product_images': (
+            ProductImage.objects.filter(product=product).order_by(*PRIMARY_ORDERING)
+            if product.image_count else []
+        ),
         'related_products': related_products,
     }
-    return render(request, 'products/product_details.html', context)
+    response = render(request, 'products/product_details.html', context)
+    response.page_cache_meta = {'product_id': product.id}
+    return response
 
+@cache_anonymous_page
 def category_products(request, slug):
     """Display products by category"""
     category = get_object_or_404(Category, slug=slug, is_active=True)
-    products = Product.objects.filter(category=category, is_active=True)
+    products = paginate_keyset(catalog_queryset().filter(category=category), request)
+    attach_effective_prices(products)
     
     context = {
         'category': category,